@@ -11,11 +11,13 @@ Usage:
 
 from __future__ import annotations
 import argparse
+import re
 import sqlite3
 import sys
 from collections import defaultdict
 from pathlib import Path
-from typing import Optional
+
+from tick_positions import FETCH_BATCH_SIZE, open_readonly
 
 # Arena dimensions (from constants.rs)
 ARENA_WIDTH = 1600
@@ -28,6 +30,9 @@ GRID_HEIGHT = ARENA_HEIGHT // CELL_SIZE  # 45
 
 HEATMAP_DIR = Path("showcase/heatmaps")
 
+# Rust keeps ASCII alphanumerics only; each other run becomes one underscore
+_NON_ALNUM_RUN = re.compile(r'[^0-9A-Za-z]+')
+
 
 def load_levels_config(levels_file: str) -> dict[str, str]:
     """Load level ID to name mapping from levels.txt config file."""
@@ -54,79 +59,100 @@ def load_levels_config(levels_file: str) -> dict[str, str]:
 
 def sanitize_level_name(name: str) -> str:
     """Sanitize level name for use in filename (matches Rust sanitize_level_name)."""
-    result = []
-    last_was_underscore = False
-
-    for ch in name:
-        if ch.isalnum():
-            result.append(ch.lower())
-            last_was_underscore = False
-        elif not last_was_underscore:
-            result.append('_')
-            last_was_underscore = True
-
-    return ''.join(result).strip('_')
-
-
-def world_to_cell(x: float, y: float) -> Optional[tuple]:
-    """Convert world coordinates to grid cell coordinates."""
-    # Match Rust world_to_cell function in heatmaps.rs
-    cx = int((x + ARENA_WIDTH / 2) / CELL_SIZE)
-    cy = int((ARENA_HEIGHT / 2 - y) / CELL_SIZE)
-
-    if cx < 0 or cy < 0:
-        return None
-    if cx >= GRID_WIDTH or cy >= GRID_HEIGHT:
-        return None
-
-    return (cx, cy)
+    return _NON_ALNUM_RUN.sub('_', name).lower().strip('_')
 
 
 def cell_to_world(cx: int, cy: int) -> tuple[float, float]:
     """Convert grid cell coordinates to world coordinates (cell center)."""
-    # Reverse of world_to_cell
+    # Reverse of the cell binning in extract_cell_counts_by_level
     x = (cx + 0.5) * CELL_SIZE - ARENA_WIDTH / 2
     y = ARENA_HEIGHT / 2 - (cy + 0.5) * CELL_SIZE
     return (x, y)
 
 
-def extract_positions_by_level(db_path: str, human_only: bool = True) -> dict[str, list[tuple[float, float]]]:
-    """Extract player positions from debug_events, grouped by level_id."""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+# CSV "x,y," prefix for every cell in export order (index cy * GRID_WIDTH + cx);
+# the grid is fixed, so the coordinates are converted and formatted once
+_WORLD_XY = [
+    f"{x:.2f},{y:.2f},"
+    for x, y in (cell_to_world(cx, cy) for cy in range(GRID_HEIGHT) for cx in range(GRID_WIDTH))
+]
+
+
+def ensure_covering_index(db_path: str, human_only: bool) -> None:
+    """Create the covering index for the binning query if it is missing.
 
-    # Query positions with level_id, optionally filtering for human-controlled
+    The filter column leads, then the grouping key, then the positions, so
+    the scan never touches table pages. This writes to the database, so it
+    only runs with --create-index.
+    """
     if human_only:
-        cursor.execute("""
-            SELECT level_id, pos_x, pos_y
-            FROM debug_events
-            WHERE human_controlled = 1
-        """)
+        name, columns = "idx_debug_human_level", "human_controlled, level_id, pos_x, pos_y"
     else:
-        cursor.execute("""
-            SELECT level_id, pos_x, pos_y
-            FROM debug_events
-        """)
-
-    positions_by_level: dict[str, list[tuple[float, float]]] = defaultdict(list)
-    for level_id, x, y in cursor.fetchall():
-        if level_id:
-            positions_by_level[level_id].append((x, y))
+        name, columns = "idx_debug_level_pos", "level_id, pos_x, pos_y"
+    conn = sqlite3.connect(db_path)
+    try:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)
+        ).fetchone()
+        if exists:
+            return
+        print(f"  Creating covering index {name} on debug_events({columns})...")
+        conn.execute(f"CREATE INDEX {name} ON debug_events({columns})")
+        conn.commit()
+    except sqlite3.OperationalError as e:
+        print(f"  Warning: could not create covering index: {e}")
+    finally:
+        conn.close()
+
+
+def extract_cell_counts_by_level(
+    db_path: str, human_only: bool = True
+) -> dict[str, list[tuple[int, int, int]]]:
+    """Bin player positions from debug_events into grid cells, grouped by level_id.
+
+    Binning runs inside SQLite, so raw positions never reach Python. Returns
+    (cx, cy, count) rows per level, including out-of-bounds cells so the
+    per-level sample count stays complete. Levels are keyed in the order
+    they first appear in debug_events, as the row-by-row export printed
+    them.
+    """
+    conn = open_readonly(db_path)
+    cursor = conn.cursor()
+    cursor.arraysize = FETCH_BATCH_SIZE
+
+    # Match Rust world_to_cell in heatmaps.rs; CAST truncates toward zero like int()
+    where = "WHERE human_controlled = 1" if human_only else ""
+    cursor.execute(f"""
+        SELECT level_id,
+               CAST((pos_x + {ARENA_WIDTH / 2}) / {CELL_SIZE} AS INTEGER) AS cx,
+               CAST(({ARENA_HEIGHT / 2} - pos_y) / {CELL_SIZE} AS INTEGER) AS cy,
+               COUNT(*),
+               MIN(rowid)
+        FROM debug_events
+        {where}
+        GROUP BY level_id, cx, cy
+    """)
+
+    counts_by_level: dict[str, list[tuple[int, int, int]]] = defaultdict(list)
+    first_row: dict[str, int] = {}
+    for rows in iter(cursor.fetchmany, []):
+        for level_id, cx, cy, count, row in rows:
+            if level_id:
+                counts_by_level[level_id].append((cx, cy, count))
+                first_row[level_id] = min(first_row.get(level_id, row), row)
 
     conn.close()
-    return dict(positions_by_level)
+    # GROUP BY returns levels in index order; restore first-appearance order
+    return {level_id: counts_by_level[level_id] for level_id in sorted(first_row, key=first_row.get)}
 
 
-def create_reachability_grid(positions: list[tuple[float, float]]) -> dict[tuple[int, int], int]:
-    """Create a grid counting visits per cell."""
-    grid: dict[tuple[int, int], int] = defaultdict(int)
-
-    for x, y in positions:
-        cell = world_to_cell(x, y)
-        if cell:
-            grid[cell] += 1
-
-    return dict(grid)
+def create_reachability_grid(cell_counts: list[tuple[int, int, int]]) -> dict[tuple[int, int], int]:
+    """Create a grid of visit counts, dropping out-of-bounds cells."""
+    return {
+        (cx, cy): count
+        for cx, cy, count in cell_counts
+        if 0 <= cx < GRID_WIDTH and 0 <= cy < GRID_HEIGHT
+    }
 
 
 def export_heatmap_csv(
@@ -137,25 +163,29 @@ def export_heatmap_csv(
     """Export grid as CSV heatmap with ALL 3600 cells filled."""
     max_count = max(grid.values()) if grid else 1
 
-    with open(output_path, 'w') as f:
-        f.write("x,y,value\n")
+    # Dense counts in export order, so the loop below needs no tuple-key lookups
+    counts = [0] * (GRID_WIDTH * GRID_HEIGHT)
+    for (cx, cy), visit_count in grid.items():
+        counts[cy * GRID_WIDTH + cx] = visit_count
 
-        # CRITICAL: Iterate through ALL cells in the grid
-        # Order: top-to-bottom (cy=0 is top), left-to-right
-        for cy in range(GRID_HEIGHT):
-            for cx in range(GRID_WIDTH):
-                world_x, world_y = cell_to_world(cx, cy)
+    rows = ["x,y,value\n"]
 
-                # Normalize visit count to 0.0-1.0
-                visit_count = grid.get((cx, cy), 0)
-                if visit_count > 0:
-                    # Normalize by max count
-                    value = visit_count / max_count
-                else:
-                    # Unvisited cell - use default value
-                    value = default_value
+    # CRITICAL: Iterate through ALL cells in the grid
+    # Order: top-to-bottom (cy=0 is top), left-to-right
+    for prefix, visit_count in zip(_WORLD_XY, counts):
+        # Normalize visit count to 0.0-1.0
+        if visit_count > 0:
+            # Normalize by max count
+            value = visit_count / max_count
+        else:
+            # Unvisited cell - use default value
+            value = default_value
 
-                f.write(f"{world_x:.2f},{world_y:.2f},{value:.3f}\n")
+        rows.append(f"{prefix}{value:.3f}\n")
+
+    # Single write for the whole file instead of one per cell
+    with open(output_path, 'w') as f:
+        f.write("".join(rows))
 
 
 def main():
@@ -184,6 +214,11 @@ def main():
         default='showcase/heatmaps',
         help='Output directory for heatmap files'
     )
+    parser.add_argument(
+        '--create-index',
+        action='store_true',
+        help='Add a covering debug_events index to the database to speed up repeat exports (writes to the DB)'
+    )
 
     args = parser.parse_args()
 
@@ -210,20 +245,26 @@ def main():
     human_only = not args.include_ai
     print(f"Extracting positions from {db_path}...")
     print(f"  Filter: {'human only' if human_only else 'human + AI'}")
-    positions_by_level = extract_positions_by_level(str(db_path), human_only=human_only)
+    if args.create_index:
+        ensure_covering_index(str(db_path), human_only)
+    counts_by_level = extract_cell_counts_by_level(str(db_path), human_only=human_only)
+    samples_by_level = {
+        level_id: sum(count for _, _, count in cell_counts)
+        for level_id, cell_counts in counts_by_level.items()
+    }
 
-    total_samples = sum(len(p) for p in positions_by_level.values())
-    print(f"  Found {total_samples} total samples across {len(positions_by_level)} levels")
+    total_samples = sum(samples_by_level.values())
+    print(f"  Found {total_samples} total samples across {len(counts_by_level)} levels")
 
     # Export heatmaps
     exported = 0
     skipped = 0
 
-    for level_id, positions in positions_by_level.items():
+    for level_id, cell_counts in counts_by_level.items():
         level_name = levels.get(level_id, f"unknown_{level_id[:8]}")
         safe_name = sanitize_level_name(level_name)
 
-        sample_count = len(positions)
+        sample_count = samples_by_level[level_id]
 
         if sample_count < args.min_samples:
             print(f"  Skipping {level_name}: {sample_count} samples (need {args.min_samples})")
@@ -231,7 +272,7 @@ def main():
             continue
 
         # Create reachability grid
-        grid = create_reachability_grid(positions)
+        grid = create_reachability_grid(cell_counts)
         cells_visited = len(grid)
         coverage = cells_visited / (GRID_WIDTH * GRID_HEIGHT) * 100
 
@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 """Generate an SVG heatmap from training database position data."""
 
-import sqlite3
+import base64
+import io
 import sys
-from collections import defaultdict
+from collections import Counter
+
+from tick_positions import extract_positions
 
 # Arena dimensions
 ARENA_WIDTH = 1400
@@ -12,44 +15,28 @@ ARENA_FLOOR_Y = -400
 
 # Grid resolution
 CELL_SIZE = 15
+GRID_WIDTH = -(-ARENA_WIDTH // CELL_SIZE)
+GRID_HEIGHT = -(-ARENA_HEIGHT // CELL_SIZE)
 
-def extract_positions(db_path, match_id=None):
-    """Extract player positions from tick events."""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+# World -> cell as one multiply-add: gx = int(x * _INV_CELL + _OX)
+_INV_CELL = 1.0 / CELL_SIZE
+_OX = ARENA_WIDTH / 2 / CELL_SIZE
+_OY = ARENA_HEIGHT / 2 / CELL_SIZE
 
-    if match_id:
-        cursor.execute("SELECT data FROM events WHERE event_type = 'T' AND match_id = ?", (match_id,))
-    else:
-        cursor.execute("SELECT data FROM events WHERE event_type = 'T'")
-
-    positions = []
-    for (data,) in cursor.fetchall():
-        parts = data.split('|')
-        if len(parts) >= 4:
-            pos_str = parts[3]
-            try:
-                x, y = map(float, pos_str.split(','))
-                positions.append((x, y))
-            except ValueError:
-                pass
-
-    conn.close()
-    return positions
-
-def create_heatmap_grid(positions):
-    """Create a 2D grid counting visits per cell."""
-    grid = defaultdict(int)
+# Heatmap cell opacity (0.8) as an 8-bit alpha
+CELL_ALPHA = 204
 
-    for x, y in positions:
-        gx = int((x + ARENA_WIDTH/2) / CELL_SIZE)
-        gy = int((y + ARENA_HEIGHT/2) / CELL_SIZE)
-        grid[(gx, gy)] += 1
+WRITE_BUFFER_SIZE = 1 << 20
 
-    return grid
+def create_heatmap_grid(xs, ys):
+    """Create a 2D grid counting visits per cell."""
+    return Counter(
+        (int(x * _INV_CELL + _OX), int(y * _INV_CELL + _OY))
+        for x, y in zip(xs, ys)
+    )
 
-def intensity_to_color(intensity):
-    """Convert 0-1 intensity to RGB hex color."""
+def intensity_to_rgb(intensity):
+    """Convert 0-1 intensity to an (r, g, b) tuple."""
     if intensity < 0.25:
         # Blue to cyan
         t = intensity * 4
@@ -67,85 +54,125 @@ def intensity_to_color(intensity):
         t = (intensity - 0.75) * 4
         r, g, b = 255, int(255 - t * 255), 0
 
+    return r, g, b
+
+def intensity_to_color(intensity):
+    """Convert 0-1 intensity to RGB hex color."""
+    r, g, b = intensity_to_rgb(intensity)
     return f"#{r:02x}{g:02x}{b:02x}"
 
-def generate_svg(grid, positions, output_path):
-    """Generate SVG heatmap."""
-    if not positions:
-        print("No position data!")
-        return
+# Per-cell colors come from 256-step lookup tables, indexed by count * 255 // max
+INTENSITY_RGB = [intensity_to_rgb(i / 255) for i in range(256)]
+INTENSITY_HEX = [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in INTENSITY_RGB]
+INTENSITY_RGBA = [bytes((r, g, b, CELL_ALPHA)) for r, g, b in INTENSITY_RGB]
 
+def render_heatmap_png(grid, max_count, scale):
+    """Rasterize the grid to a base64 PNG, one pixel per cell scaled up.
+
+    Returns None when PIL is not available.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+
+    # RGBA with empty cells left transparent (row 0 is the top of the arena)
+    pixels = bytearray(GRID_WIDTH * GRID_HEIGHT * 4)
+    for (gx, gy), count in grid.items():
+        if 0 <= gx < GRID_WIDTH and 0 <= gy < GRID_HEIGHT:
+            i = ((GRID_HEIGHT - 1 - gy) * GRID_WIDTH + gx) * 4
+            pixels[i:i + 4] = INTENSITY_RGBA[count * 255 // max_count]
+
+    img = Image.frombytes('RGBA', (GRID_WIDTH, GRID_HEIGHT), bytes(pixels))
+    img = img.resize(
+        (int(GRID_WIDTH * CELL_SIZE * scale), int(GRID_HEIGHT * CELL_SIZE * scale)),
+        Image.NEAREST,
+    )
+    buf = io.BytesIO()
+    img.save(buf, format='PNG')
+    return base64.b64encode(buf.getvalue()).decode('ascii')
+
+def svg_lines(grid, sample_count, max_count):
+    """Yield the SVG document line by line (newline-terminated except the last)."""
     # SVG dimensions (scaled down)
     scale = 0.5
     svg_width = int(ARENA_WIDTH * scale)
     svg_height = int(ARENA_HEIGHT * scale)
 
-    max_count = max(grid.values()) if grid else 1
-
-    svg_parts = [
-        f'<svg xmlns="http://www.w3.org/2000/svg" width="{svg_width}" height="{svg_height}">',
-        f'<rect width="100%" height="100%" fill="#1a1a2e"/>',
-        '<!-- Arena outline -->',
-        f'<rect x="0" y="0" width="{svg_width}" height="{svg_height}" fill="none" stroke="#444" stroke-width="2"/>',
-    ]
+    yield f'<svg xmlns="http://www.w3.org/2000/svg" width="{svg_width}" height="{svg_height}">\n'
+    yield '<rect width="100%" height="100%" fill="#1a1a2e"/>\n'
+    yield '<!-- Arena outline -->\n'
+    yield f'<rect x="0" y="0" width="{svg_width}" height="{svg_height}" fill="none" stroke="#444" stroke-width="2"/>\n'
 
     # Draw floor line
     floor_y = int((ARENA_HEIGHT/2 - ARENA_FLOOR_Y) * scale)
-    svg_parts.append(f'<line x1="0" y1="{floor_y}" x2="{svg_width}" y2="{floor_y}" stroke="#666" stroke-width="2"/>')
-
-    # Draw heatmap cells
-    cell_w = int(CELL_SIZE * scale)
-    cell_h = int(CELL_SIZE * scale)
-
-    for (gx, gy), count in grid.items():
-        intensity = count / max_count
-        color = intensity_to_color(intensity)
+    yield f'<line x1="0" y1="{floor_y}" x2="{svg_width}" y2="{floor_y}" stroke="#666" stroke-width="2"/>\n'
+
+    # Draw heatmap cells as one embedded image; fall back to a rect per cell
+    png_b64 = render_heatmap_png(grid, max_count, scale)
+    if png_b64 is not None:
+        img_w = int(GRID_WIDTH * CELL_SIZE * scale)
+        img_h = int(GRID_HEIGHT * CELL_SIZE * scale)
+        yield (
+            f'<image x="0" y="{svg_height - img_h}" width="{img_w}" height="{img_h}" '
+            f'href="data:image/png;base64,{png_b64}"/>\n'
+        )
+    else:
+        cell_w = int(CELL_SIZE * scale)
+        cell_h = int(CELL_SIZE * scale)
+        rect_tmpl = '<rect x="{}" y="{}" width="%d" height="%d" fill="{}" opacity="0.8"/>\n' % (cell_w, cell_h)
 
-        # Convert to SVG coords (flip Y)
-        px = int(gx * CELL_SIZE * scale)
-        py = svg_height - int(gy * CELL_SIZE * scale) - cell_h
+        for (gx, gy), count in grid.items():
+            # Convert to SVG coords (flip Y)
+            px = int(gx * CELL_SIZE * scale)
+            py = svg_height - int(gy * CELL_SIZE * scale) - cell_h
 
-        svg_parts.append(
-            f'<rect x="{px}" y="{py}" width="{cell_w}" height="{cell_h}" '
-            f'fill="{color}" opacity="0.8"/>'
-        )
+            yield rect_tmpl.format(px, py, INTENSITY_HEX[count * 255 // max_count])
 
     # Add legend
     legend_y = 20
-    svg_parts.append(f'<text x="10" y="{legend_y}" fill="white" font-size="12">Samples: {len(positions)}</text>')
-    svg_parts.append(f'<text x="10" y="{legend_y + 15}" fill="white" font-size="12">Cells: {len(grid)}</text>')
-    svg_parts.append(f'<text x="10" y="{legend_y + 30}" fill="white" font-size="12">Max: {max_count}</text>')
+    yield f'<text x="10" y="{legend_y}" fill="white" font-size="12">Samples: {sample_count}</text>\n'
+    yield f'<text x="10" y="{legend_y + 15}" fill="white" font-size="12">Cells: {len(grid)}</text>\n'
+    yield f'<text x="10" y="{legend_y + 30}" fill="white" font-size="12">Max: {max_count}</text>\n'
 
     # Color scale legend
     for i, label in enumerate(['Low', 'Med', 'High']):
         color = intensity_to_color(i / 2)
-        svg_parts.append(f'<rect x="{svg_width - 80}" y="{20 + i*20}" width="15" height="15" fill="{color}"/>')
-        svg_parts.append(f'<text x="{svg_width - 60}" y="{32 + i*20}" fill="white" font-size="11">{label}</text>')
-
-    svg_parts.append('</svg>')
+        yield f'<rect x="{svg_width - 80}" y="{20 + i*20}" width="15" height="15" fill="{color}"/>\n'
+        yield f'<text x="{svg_width - 60}" y="{32 + i*20}" fill="white" font-size="11">{label}</text>\n'
 
-    svg_content = '\n'.join(svg_parts)
+    yield '</svg>'
 
-    with open(output_path, 'w') as f:
-        f.write(svg_content)
+def generate_svg(grid, sample_count, output_path):
+    """Generate SVG heatmap, plus an HTML wrapper for easy viewing."""
+    if not sample_count:
+        print("No position data!")
+        return
 
-    print(f"SVG heatmap saved to: {output_path}")
+    max_count = max(grid.values()) if grid else 1
 
-    # Also create HTML wrapper for easy viewing
     html_path = output_path.replace('.svg', '.html')
-    html_content = f'''<!DOCTYPE html>
+    html_header = f'''<!DOCTYPE html>
 <html>
 <head><title>Reachability Heatmap</title></head>
 <body style="background: #111; margin: 20px;">
 <h2 style="color: white;">Reachability Heatmap</h2>
-<p style="color: #aaa;">Samples: {len(positions)} | Unique cells: {len(grid)} | Max visits: {max_count}</p>
-{svg_content}
+<p style="color: #aaa;">Samples: {sample_count} | Unique cells: {len(grid)} | Max visits: {max_count}</p>
+'''
+    html_footer = '''
 </body>
 </html>'''
 
-    with open(html_path, 'w') as f:
-        f.write(html_content)
+    # Stream each line into both files rather than building the document in memory
+    with open(output_path, 'w', buffering=WRITE_BUFFER_SIZE) as svg_file, \
+            open(html_path, 'w', buffering=WRITE_BUFFER_SIZE) as html_file:
+        html_file.write(html_header)
+        for line in svg_lines(grid, sample_count, max_count):
+            svg_file.write(line)
+            html_file.write(line)
+        html_file.write(html_footer)
 
+    print(f"SVG heatmap saved to: {output_path}")
     print(f"HTML viewer saved to: {html_path}")
 
 def main():
@@ -153,16 +180,16 @@ def main():
     match_id = int(sys.argv[2]) if len(sys.argv) > 2 else None
 
     print(f"Loading positions from {db_path}...")
-    positions = extract_positions(db_path, match_id)
+    xs, ys = extract_positions(db_path, match_id)
 
-    print(f"Found {len(positions)} position samples")
+    print(f"Found {len(xs)} position samples")
 
-    if not positions:
+    if not xs:
         print("No position data found!")
         return
 
-    grid = create_heatmap_grid(positions)
-    generate_svg(grid, positions, "showcase/reachability_heatmap.svg")
+    grid = create_heatmap_grid(xs, ys)
+    generate_svg(grid, len(xs), "showcase/reachability_heatmap.svg")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,71 @@
+"""Read-only training DB access and tick positions shared by the scripts."""
+
+import sqlite3
+from array import array
+from pathlib import Path
+
+# Read-side SQLite tuning: 64 MiB page cache, 256 MiB memory-mapped I/O
+READ_CACHE_SIZE = -65536
+READ_MMAP_SIZE = 256 * 1024 * 1024
+FETCH_BATCH_SIZE = 10000
+
+# Tick data is "T:time|T|tick|x,y|vx,vy|...". The 4th field (player position)
+# is sliced out inside SQLite so each row comes back as two floats; rows with
+# fewer fields or a malformed vector are dropped. A component is kept only if
+# the whole field is a number: comparing it with its own REAL cast applies
+# numeric affinity, which converts well-formed numbers only, whereas the cast
+# alone would read "12abc" as 12.0 and "abc" as 0.0.
+POSITION_QUERY = """
+    WITH f1 AS (
+        SELECT substr(data, instr(data, '|') + 1) AS rest
+        FROM events
+        WHERE event_type = 'T' {match_filter} AND instr(data, '|') > 0
+    ),
+    f2 AS (SELECT substr(rest, instr(rest, '|') + 1) AS rest FROM f1 WHERE instr(rest, '|') > 0),
+    f3 AS (SELECT substr(rest, instr(rest, '|') + 1) AS rest FROM f2 WHERE instr(rest, '|') > 0),
+    pos AS (
+        SELECT CASE WHEN instr(rest, '|') > 0
+                    THEN substr(rest, 1, instr(rest, '|') - 1)
+                    ELSE rest END AS xy
+        FROM f3
+    ),
+    vec AS (
+        SELECT substr(xy, 1, instr(xy, ',') - 1) AS x, substr(xy, instr(xy, ',') + 1) AS y
+        FROM pos
+        WHERE instr(xy, ',') > 0
+    )
+    SELECT CAST(x AS REAL), CAST(y AS REAL)
+    FROM vec
+    WHERE x = CAST(x AS REAL) AND y = CAST(y AS REAL)
+"""
+
+def open_readonly(db_path):
+    """Open db_path read-only, tuned for one large sequential read."""
+    uri = f"{Path(db_path).absolute().as_uri()}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, isolation_level=None)
+    conn.execute(f"PRAGMA cache_size = {READ_CACHE_SIZE}")
+    conn.execute(f"PRAGMA mmap_size = {READ_MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+def extract_positions(db_path, match_id=None):
+    """Extract player positions from tick events as parallel x/y arrays."""
+    conn = open_readonly(db_path)
+    cursor = conn.cursor()
+    cursor.arraysize = FETCH_BATCH_SIZE
+
+    if match_id:
+        cursor.execute(POSITION_QUERY.format(match_filter="AND match_id = ?"), (match_id,))
+    else:
+        cursor.execute(POSITION_QUERY.format(match_filter=""))
+
+    xs = array('d')
+    ys = array('d')
+    # Stream in batches so the full result set is never held as Python tuples
+    for rows in iter(cursor.fetchmany, []):
+        for x, y in rows:
+            xs.append(x)
+            ys.append(y)
+
+    conn.close()
+    return xs, ys
@@ -15,6 +15,7 @@ use crate::events::{ControllerSource, EventBus, GameEvent, PlayerId};
 use crate::levels::LevelDatabase;
 use crate::player::{Grounded, HoldingBall, HumanControlled, Player, TargetBasket, Team};
 use crate::scoring::CurrentLevel;
+use crate::tuning::heatmap_tuning;
 use crate::world::Basket;
 
 /// Calculate the interception position on the line between ball carrier and defender's basket.
@@ -408,12 +409,13 @@ pub fn ai_decision_update(
     let level_score_weight = level_settings
         .map(|level| level.heatmap_score_weight)
         .unwrap_or(1.0);
+    let tuning = heatmap_tuning();
     let los_threshold = level_settings
         .map(|level| level.heatmap_los_threshold)
-        .unwrap_or(HEATMAP_LOS_THRESHOLD_DEFAULT);
+        .unwrap_or(tuning.los_threshold);
     let los_margin = level_settings
         .map(|level| level.heatmap_los_margin)
-        .unwrap_or(HEATMAP_LOS_MARGIN_DEFAULT);
+        .unwrap_or(tuning.los_margin);
 
     for (
         ai_entity,
@@ -554,7 +556,7 @@ pub fn ai_decision_update(
                     .clamp(0.0, 1.0);
                 let score_heatmap = heatmaps.score_for_basket(target_basket_type, ai_pos);
                 let heatmap_multiplier =
-                    1.0 + (HEATMAP_SCORE_WEIGHT_DEFAULT * level_score_weight * score_heatmap);
+                    1.0 + (tuning.score_weight * level_score_weight * score_heatmap);
                 let shot_quality = (base_quality * heatmap_multiplier).clamp(0.0, 1.0);
 
                 let los_value = heatmaps.line_of_sight_for_basket(target_basket_type, ai_pos);
@@ -163,50 +163,54 @@ fn main() {
         return;
     }
 
-    // Event audit mode (base vs current)
-    if let Some((base_db, current_db)) = &config.event_audit {
-        let report = run_event_audit(base_db, current_db)
-            .unwrap_or_else(|e| {
-                eprintln!("Failed to run event audit: {}", e);
+    // Event audit mode (base vs current) and focused analysis (single DB).
+    // Both flags repeat; the Nth output flag names the Nth report, so one
+    // process can run a whole batch of analyses.
+    if !config.event_audits.is_empty() || !config.focused_dbs.is_empty() {
+        for (idx, (base_db, current_db)) in config.event_audits.iter().enumerate() {
+            let report = run_event_audit(base_db, current_db)
+                .unwrap_or_else(|e| {
+                    eprintln!("Failed to run event audit: {}", e);
+                    std::process::exit(1);
+                })
+                .to_markdown();
+
+            let output_path = config
+                .audit_outputs
+                .get(idx)
+                .cloned()
+                .unwrap_or_else(default_audit_output_path);
+            if let Some(parent) = output_path.parent() {
+                std::fs::create_dir_all(parent).ok();
+            }
+            if let Err(e) = std::fs::write(&output_path, &report) {
+                eprintln!("Failed to write audit report: {}", e);
                 std::process::exit(1);
-            })
-            .to_markdown();
-
-        let output_path = config
-            .audit_output
-            .clone()
-            .unwrap_or_else(default_audit_output_path);
-        if let Some(parent) = output_path.parent() {
-            std::fs::create_dir_all(parent).ok();
-        }
-        if let Err(e) = std::fs::write(&output_path, &report) {
-            eprintln!("Failed to write audit report: {}", e);
-            std::process::exit(1);
+            }
+            println!("Event audit written to {}", output_path.display());
         }
-        println!("Event audit written to {}", output_path.display());
-        return;
-    }
 
-    // Focused analysis (single DB)
-    if let Some(db_path) = &config.focused_db {
-        let report = run_focused_analysis(db_path)
-            .unwrap_or_else(|e| {
-                eprintln!("Failed to run focused analysis: {}", e);
+        for (idx, db_path) in config.focused_dbs.iter().enumerate() {
+            let report = run_focused_analysis(db_path)
+                .unwrap_or_else(|e| {
+                    eprintln!("Failed to run focused analysis: {}", e);
+                    std::process::exit(1);
+                })
+                .to_markdown();
+            let output_path = config
+                .focused_outputs
+                .get(idx)
+                .cloned()
+                .unwrap_or_else(default_focused_output_path);
+            if let Some(parent) = output_path.parent() {
+                std::fs::create_dir_all(parent).ok();
+            }
+            if let Err(e) = std::fs::write(&output_path, &report) {
+                eprintln!("Failed to write focused report: {}", e);
                 std::process::exit(1);
-            })
-            .to_markdown();
-        let output_path = config
-            .focused_output
-            .clone()
-            .unwrap_or_else(default_focused_output_path);
-        if let Some(parent) = output_path.parent() {
-            std::fs::create_dir_all(parent).ok();
-        }
-        if let Err(e) = std::fs::write(&output_path, &report) {
-            eprintln!("Failed to write focused report: {}", e);
-            std::process::exit(1);
+            }
+            println!("Focused analysis written to {}", output_path.display());
         }
-        println!("Focused analysis written to {}", output_path.display());
         return;
     }
 
@@ -292,10 +296,10 @@ struct AnalyzeConfig {
     db_path: PathBuf,
     targets_file: Option<PathBuf>,
     output_file: Option<PathBuf>,
-    event_audit: Option<(PathBuf, PathBuf)>,
-    audit_output: Option<PathBuf>,
-    focused_db: Option<PathBuf>,
-    focused_output: Option<PathBuf>,
+    event_audits: Vec<(PathBuf, PathBuf)>,
+    audit_outputs: Vec<PathBuf>,
+    focused_dbs: Vec<PathBuf>,
+    focused_outputs: Vec<PathBuf>,
     training_db: Option<PathBuf>,
     training_output: Option<PathBuf>,
     request_name: Option<String>,
@@ -318,10 +322,10 @@ impl Default for AnalyzeConfig {
             db_path: PathBuf::from("db/training.db"),
             targets_file: None,
             output_file: None,
-            event_audit: None,
-            audit_output: None,
-            focused_db: None,
-            focused_output: None,
+            event_audits: Vec::new(),
+            audit_outputs: Vec::new(),
+            focused_dbs: Vec::new(),
+            focused_outputs: Vec::new(),
             training_db: None,
             training_output: None,
             request_name: None,
@@ -362,26 +366,27 @@ impl AnalyzeConfig {
                 }
                 "--event-audit" => {
                     if i + 2 < args.len() {
-                        config.event_audit =
-                            Some((PathBuf::from(&args[i + 1]), PathBuf::from(&args[i + 2])));
+                        config
+                            .event_audits
+                            .push((PathBuf::from(&args[i + 1]), PathBuf::from(&args[i + 2])));
                         i += 2;
                     }
                 }
                 "--audit-output" => {
                     if i + 1 < args.len() {
-                        config.audit_output = Some(PathBuf::from(&args[i + 1]));
+                        config.audit_outputs.push(PathBuf::from(&args[i + 1]));
                         i += 1;
                     }
                 }
                 "--focused" => {
                     if i + 1 < args.len() {
-                        config.focused_db = Some(PathBuf::from(&args[i + 1]));
+                        config.focused_dbs.push(PathBuf::from(&args[i + 1]));
                         i += 1;
                     }
                 }
                 "--focused-output" => {
                     if i + 1 < args.len() {
-                        config.focused_output = Some(PathBuf::from(&args[i + 1]));
+                        config.focused_outputs.push(PathBuf::from(&args[i + 1]));
                         i += 1;
                     }
                 }
@@ -486,10 +491,12 @@ ARGUMENTS:
 OPTIONS:
     --targets <FILE>    Load tuning targets from TOML file
     --output, -o <FILE> Write full report to file
-    --event-audit <BASE_DB> <CURRENT_DB>  Compare two DBs via event audit queries
+    --event-audit <BASE_DB> <CURRENT_DB>  Compare two DBs via event audit queries (repeatable)
     --audit-output <FILE> Write event audit report to file (default: notes/analysis_runs/...)
-    --focused <DB>       Run focused analysis on a single DB
+                         Repeat to name the report of each --event-audit in order
+    --focused <DB>       Run focused analysis on a single DB (repeatable)
     --focused-output <FILE> Write focused report to file (default: notes/analysis_runs/...)
+                         Repeat to name the report of each --focused in order
     --training-db <DB>   Run training debug analysis on a training DB
     --training-output <DIR> Output directory for training analysis (default: training_logs/session_x/analysis)
     --request <NAME>     Run a stored SQL analysis request
@@ -521,6 +528,9 @@ EXAMPLES:
     # Focused analysis: deep dive on a single DB
     cargo run --bin analyze -- --focused db/current.db
 
+    # Batch: several analyses in one process, each with its own report
+    cargo run --bin analyze -- --focused db/a.db --focused-output a.md --focused db/b.db --focused-output b.md
+
     # Training debug analysis
     cargo run --bin analyze -- --training-db db/training_YYYYMMDD_HHMMSS.db
 
@@ -6,6 +6,7 @@ use std::fs;
 use std::hash::{Hash, Hasher};
 
 use crate::constants::*;
+use crate::tuning::heatmap_tuning;
 
 /// Generate a deterministic 16-char hex UUID from a name.
 /// Used for backward compatibility when config files lack explicit IDs.
@@ -68,6 +69,7 @@ impl LevelDatabase {
 
     /// Parse level data from string
     pub fn parse(content: &str) -> Self {
+        let tuning = heatmap_tuning();
         let mut levels = Vec::new();
         let mut current_level: Option<LevelData> = None;
 
@@ -98,8 +100,8 @@ impl LevelDatabase {
                     debug: false,                            // default
                     regression: false,                       // default
                     heatmap_score_weight: 1.0,
-                    heatmap_los_threshold: HEATMAP_LOS_THRESHOLD_DEFAULT,
-                    heatmap_los_margin: HEATMAP_LOS_MARGIN_DEFAULT,
+                    heatmap_los_threshold: tuning.los_threshold,
+                    heatmap_los_margin: tuning.los_margin,
                 });
             } else if let Some(id_str) = line.strip_prefix("id:") {
                 if let Some(level) = &mut current_level {
@@ -208,6 +210,7 @@ impl LevelDatabase {
 
     /// Hardcoded fallback levels
     pub fn default_levels() -> Self {
+        let tuning = heatmap_tuning();
         Self {
             levels: vec![
                 LevelData {
@@ -227,8 +230,8 @@ impl LevelDatabase {
                     debug: false,
                     regression: false,
                     heatmap_score_weight: 1.0,
-                    heatmap_los_threshold: HEATMAP_LOS_THRESHOLD_DEFAULT,
-                    heatmap_los_margin: HEATMAP_LOS_MARGIN_DEFAULT,
+                    heatmap_los_threshold: tuning.los_threshold,
+                    heatmap_los_margin: tuning.los_margin,
                 },
                 LevelData {
                     id: generate_uuid_from_name("Default"),
@@ -253,8 +256,8 @@ impl LevelDatabase {
                     debug: false,
                     regression: false,
                     heatmap_score_weight: 1.0,
-                    heatmap_los_threshold: HEATMAP_LOS_THRESHOLD_DEFAULT,
-                    heatmap_los_margin: HEATMAP_LOS_MARGIN_DEFAULT,
+                    heatmap_los_threshold: tuning.los_threshold,
+                    heatmap_los_margin: tuning.los_margin,
                 },
             ],
         }
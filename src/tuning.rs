@@ -3,6 +3,7 @@
 use bevy::log::warn;
 use bevy::prelude::Resource;
 use serde::{Deserialize, Serialize};
+use std::sync::OnceLock;
 
 use crate::constants::*;
 
@@ -366,6 +367,52 @@ pub fn apply_global_tuning(tweaks: &mut PhysicsTweaks) -> Result<(), String> {
     }
 }
 
+/// Path to optional heatmap weighting overrides (written by variant tournaments)
+pub const HEATMAP_TUNING_FILE: &str = "config/heatmap_tuning.json";
+
+/// Heatmap weighting for AI shot selection, keyed by the constants it overrides
+#[derive(Debug, Clone, Copy, Serialize, Deserialize)]
+#[serde(default, deny_unknown_fields)]
+pub struct HeatmapTuning {
+    #[serde(rename = "HEATMAP_SCORE_WEIGHT_DEFAULT")]
+    pub score_weight: f32,
+    #[serde(rename = "HEATMAP_LOS_THRESHOLD_DEFAULT")]
+    pub los_threshold: f32,
+    #[serde(rename = "HEATMAP_LOS_MARGIN_DEFAULT")]
+    pub los_margin: f32,
+}
+
+impl Default for HeatmapTuning {
+    fn default() -> Self {
+        Self {
+            score_weight: HEATMAP_SCORE_WEIGHT_DEFAULT,
+            los_threshold: HEATMAP_LOS_THRESHOLD_DEFAULT,
+            los_margin: HEATMAP_LOS_MARGIN_DEFAULT,
+        }
+    }
+}
+
+pub fn load_heatmap_tuning_from_file(path: &str) -> Result<HeatmapTuning, String> {
+    let contents =
+        std::fs::read_to_string(path).map_err(|e| format!("Failed to read {}: {}", path, e))?;
+    serde_json::from_str(&contents).map_err(|e| format!("Failed to parse {}: {}", path, e))
+}
+
+/// Heatmap tuning for this process, read once from HEATMAP_TUNING_FILE.
+/// Without the file the constants.rs defaults apply.
+pub fn heatmap_tuning() -> &'static HeatmapTuning {
+    static TUNING: OnceLock<HeatmapTuning> = OnceLock::new();
+    TUNING.get_or_init(|| {
+        if !std::path::Path::new(HEATMAP_TUNING_FILE).exists() {
+            return HeatmapTuning::default();
+        }
+        load_heatmap_tuning_from_file(HEATMAP_TUNING_FILE).unwrap_or_else(|err| {
+            warn!("{}", err);
+            HeatmapTuning::default()
+        })
+    })
+}
+
 pub fn load_global_tuning_system(mut tweaks: bevy::prelude::ResMut<PhysicsTweaks>) {
     if let Err(err) = apply_global_tuning(&mut tweaks) {
         warn!("{}", err);
@@ -1,5 +1,4 @@
 #!/usr/bin/env python3
-# TODO: Add a file lock around src/constants.rs and config/ai_profiles.txt edits to prevent concurrent runs clobbering each other.
 # TODO: Include baseline summary + percent deltas in the report header for quicker scans.
 # TODO: Add charge duration delta and possession delta to each variant summary block.
 # TODO: Update top-3 ranking to include shot% and match duration (not just goals/shots/scoreless).
@@ -10,6 +9,9 @@
 #   - Keep H4 constants, tweak seek_threshold: -0.03 and -0.05.
 #   - Run smaller sweep first (matches-per-pair 2, same profiles), then re-run best 2 with matches-per-pair 4.
 import argparse
+import hashlib
+import heapq
+import io
 import json
 import os
 import pathlib
@@ -18,10 +20,45 @@ import shutil
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional
-
-ROOT = pathlib.Path(__file__).resolve().parents[1]
+from typing import Deque, Dict, List, Tuple, Optional
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+
+# Each variant runs in its own workspace (private copies of config/ and of
+# every directory simulate writes to, plus symlinks to the rest of the tree)
+# so variants can run concurrently against one build.
+WORKSPACE_ROOT = ROOT / "target" / "variant_tournaments"
+WORKSPACE_COPIES = {"config", "showcase", "notes"}
+WORKSPACE_SKIP = {"target", "db", ".git"}
+
+# Patterns for child process output and focused report summaries
+DB_PATH_RE = re.compile(r"Using database: (db/[^\s]+)")
+SUMMARY_BLOCK_RE = re.compile(r"## Summary\n(.*?)\n\n", re.S)
+SUMMARY_LINE_RE = re.compile(r"^[ \t]*- ([^:\n]+): ([0-9.]+)", re.M)
+
+# Config file fields, scanned over the whole file (see scan_fields)
+PROFILE_NAME_RE = re.compile(r"^profile:(.*)$", re.M)
+LEVEL_NAME_RE = re.compile(r"^[ \t]*level:(.*)$", re.M)
+_SCAN_CACHE: Dict[Tuple[str, str], Tuple[int, List[str]]] = {}
+
+# Child output is streamed; only this many trailing lines are kept for errors
+OUTPUT_TAIL_LINES = 4096
+
+# Constants the game reads at startup from config/heatmap_tuning.json
+HEATMAP_TUNING_KEYS = {
+    "HEATMAP_SCORE_WEIGHT_DEFAULT",
+    "HEATMAP_LOS_THRESHOLD_DEFAULT",
+    "HEATMAP_LOS_MARGIN_DEFAULT",
+}
+
+# One marker per heatmap input digest, listing the files that run wrote; the
+# phase is skipped only if the marker exists and every listed file is intact
+HEATMAP_CACHE_DIR = ROOT / "showcase" / "heatmaps" / ".cache"
+HEATMAP_INPUTS = ["config/levels.txt", "config/gameplay_tuning.json"]
+HEATMAP_OUTPUT_DIR = ROOT / "showcase" / "heatmaps"
 
 @dataclass
 class VariantResult:
@@ -35,50 +72,67 @@ class VariantResult:
     summary: Dict[str, float]
 
 
-def read_text(path: pathlib.Path) -> str:
-    return path.read_text()
-
-
-def write_text(path: pathlib.Path, content: str) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content)
+def run_cmd(
+    cmd: List[str],
+    cwd: pathlib.Path,
+    env: Optional[Dict[str, str]] = None,
+    capture: Optional[re.Pattern] = None,
+) -> Tuple[int, str, List[str]]:
+    """Run cmd, streaming its combined output line by line.
 
-
-def run_cmd(cmd: List[str], cwd: pathlib.Path, env: Optional[Dict[str, str]] = None) -> Tuple[int, str]:
+    Returns the exit code, the last OUTPUT_TAIL_LINES lines of output (for
+    error reporting) and group 1 of every line matching `capture`.
+    """
     run_env = None
     if env:
         run_env = os.environ.copy()
         run_env.update(env)
-    proc = subprocess.run(
+    tail: Deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
+    captured = []
+    with subprocess.Popen(
         cmd,
         cwd=cwd,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
         text=True,
+        bufsize=1,
         env=run_env,
-    )
-    return proc.returncode, proc.stdout
+    ) as proc:
+        for line in proc.stdout:
+            tail.append(line)
+            if capture is not None:
+                m = capture.search(line)
+                if m:
+                    captured.append(m.group(1))
+        code = proc.wait()
+    return code, "".join(tail), captured
+
+
+def scan_fields(path: pathlib.Path, pattern: re.Pattern) -> List[str]:
+    """Return group 1 (stripped) of every match of pattern in path.
+
+    The whole file is scanned with one compiled regex instead of being split
+    into lines; results are cached until the file's mtime changes.
+    """
+    key = (str(path), pattern.pattern)
+    mtime = path.stat().st_mtime_ns
+    cached = _SCAN_CACHE.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    values = [m.group(1).strip() for m in pattern.finditer(path.read_text())]
+    _SCAN_CACHE[key] = (mtime, values)
+    return values
 
 
 def parse_top_profiles(ai_profiles_path: pathlib.Path, count: int) -> List[str]:
-    names = []
-    for line in ai_profiles_path.read_text().splitlines():
-        if line.startswith("profile:"):
-            names.append(line.split(":", 1)[1].strip())
-            if len(names) >= count:
-                break
+    names = scan_fields(ai_profiles_path, PROFILE_NAME_RE)[:count]
     if len(names) < count:
         raise RuntimeError(f"Found only {len(names)} profiles in {ai_profiles_path}")
     return names
 
 
 def parse_level_names(levels_path: pathlib.Path) -> List[str]:
-    names = []
-    for line in levels_path.read_text().splitlines():
-        line = line.strip()
-        if line.startswith("level:"):
-            names.append(line.split(":", 1)[1].strip())
-    return names
+    return list(scan_fields(levels_path, LEVEL_NAME_RE))
 
 
 def resolve_levels_from_sim_settings(levels_path: pathlib.Path, sim_settings_path: pathlib.Path) -> List[str]:
@@ -100,72 +154,220 @@ def resolve_levels_from_sim_settings(levels_path: pathlib.Path, sim_settings_pat
     return resolved
 
 
-def apply_constants(constants_path: pathlib.Path, constants: Dict[str, float]) -> None:
-    text = constants_path.read_text()
-    for key, value in constants.items():
-        pattern = re.compile(rf"^pub const {re.escape(key)}: f32 = ([0-9.]+);$", re.M)
-        if not pattern.search(text):
-            raise RuntimeError(f"Could not find constant {key} in {constants_path}")
-        text = pattern.sub(f"pub const {key}: f32 = {value};", text)
-    constants_path.write_text(text)
+def apply_constants(tuning_path: pathlib.Path, constants: Dict[str, float]) -> None:
+    unknown = sorted(set(constants) - HEATMAP_TUNING_KEYS)
+    if unknown:
+        raise RuntimeError(f"Unknown tuning constants: {', '.join(unknown)}")
+    tuning = json.loads(tuning_path.read_text()) if tuning_path.exists() else {}
+    tuning.update(constants)
+    tuning_path.write_text(json.dumps(tuning, indent=2) + "\n")
 
 
-def parse_profiles(ai_profiles_path: pathlib.Path) -> List[Dict[str, str]]:
-    blocks = []
-    current = []
-    for line in ai_profiles_path.read_text().splitlines():
-        if line.startswith("profile:") and current:
-            blocks.append(current)
-            current = [line]
-        else:
-            current.append(line)
-    if current:
-        blocks.append(current)
-    return blocks
-
-
-def update_profile_block(block: List[str], deltas: Dict[str, float]) -> List[str]:
+def apply_profile_deltas(ai_profiles_path: pathlib.Path, top_profiles: List[str], deltas: Dict[str, float]) -> None:
+    # Single pass: track whether the current profile block is selected and
+    # rewrite only the "key: value" lines whose key has a delta
+    selected = set(top_profiles)
+    active = False
     out = []
-    profile_name = None
-    for line in block:
+    for line in ai_profiles_path.read_text().splitlines():
         if line.startswith("profile:"):
-            profile_name = line.split(":", 1)[1].strip()
+            active = line.split(":", 1)[1].strip() in selected
+        elif active:
+            key, sep, rest = line.partition(":")
+            if sep and key in deltas:
+                line = f"{key}: {float(rest.strip()) + deltas[key]}"
         out.append(line)
-    # Apply deltas in-place
-    for i, line in enumerate(out):
-        for key, delta in deltas.items():
-            if line.startswith(f"{key}:"):
-                base = float(line.split(":", 1)[1].strip())
-                out[i] = f"{key}: {base + delta}"
-    return out
+    ai_profiles_path.write_text("\n".join(out) + "\n")
 
 
-def apply_profile_deltas(ai_profiles_path: pathlib.Path, top_profiles: List[str], deltas: Dict[str, float]) -> None:
-    blocks = parse_profiles(ai_profiles_path)
-    updated = []
-    for block in blocks:
-        name_line = next((line for line in block if line.startswith("profile:")), None)
-        if not name_line:
-            updated.append(block)
+def build_binaries(cwd: pathlib.Path, bins: List[str], release: bool = True) -> pathlib.Path:
+    """Build the given binaries once and return the directory holding them.
+
+    Callers exec the binaries directly afterwards instead of paying for a
+    `cargo run` (manifest load, freshness check, build lock) on every call.
+    """
+    cmd = ["cargo", "build"] + (["--release"] if release else [])
+    for name in bins:
+        cmd.extend(["--bin", name])
+    code, out, _ = run_cmd(cmd, cwd)
+    if code != 0:
+        print(out)
+        raise RuntimeError(f"cargo build failed in {cwd}")
+    return cargo_target_dir(cwd) / ("release" if release else "debug")
+
+
+def cargo_target_dir(cwd: pathlib.Path) -> pathlib.Path:
+    """Ask cargo where it builds, honouring CARGO_TARGET_DIR and config files."""
+    proc = subprocess.run(
+        ["cargo", "metadata", "--format-version", "1", "--no-deps"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        print(proc.stderr)
+        raise RuntimeError(f"cargo metadata failed in {cwd}")
+    target_dir = pathlib.Path(json.loads(proc.stdout)["target_directory"])
+    # A relative path is relative to where cargo ran, not to this script
+    return target_dir if target_dir.is_absolute() else cwd / target_dir
+
+
+def heatmap_cache_key(heatmap_bin: pathlib.Path, level_list: List[str], kinds: List[str]) -> str:
+    """Digest everything the heatmap binary reads.
+
+    The binary itself stands in for src/constants.rs, since the geometry
+    constants are compiled in.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    h.update(heatmap_bin.read_bytes())
+    for rel in HEATMAP_INPUTS:
+        path = ROOT / rel
+        if path.exists():
+            h.update(path.read_bytes())
+    h.update("|".join(level_list + kinds).encode())
+    return h.hexdigest()
+
+
+def heatmap_outputs() -> List[pathlib.Path]:
+    """Every file `heatmap --refresh` clears, i.e. everything a run writes."""
+    return sorted(HEATMAP_OUTPUT_DIR.glob("heatmap_*")) + sorted(
+        (ROOT / "showcase").glob("heatmap_*.png")
+    )
+
+
+def write_heatmap_marker(marker: pathlib.Path) -> None:
+    """Record the size and mtime of each heatmap output in the marker."""
+    manifest = {}
+    for path in heatmap_outputs():
+        st = path.stat()
+        manifest[str(path.relative_to(ROOT))] = [st.st_size, st.st_mtime_ns]
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    marker.write_text(json.dumps(manifest, indent=1, sort_keys=True) + "\n")
+
+
+def heatmaps_present(marker: pathlib.Path) -> bool:
+    """Check that every output recorded in the marker is still the same file.
+
+    A file rewritten by another run, truncated mid-write or deleted no
+    longer matches its recorded size and mtime.
+    """
+    try:
+        manifest = json.loads(marker.read_text())
+    except (OSError, ValueError):
+        return False
+    if not manifest:
+        return False
+    for rel, (size, mtime_ns) in manifest.items():
+        try:
+            st = (ROOT / rel).stat()
+        except OSError:
+            return False
+        if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+            return False
+    return True
+
+
+def prepare_workspace(vid: str) -> pathlib.Path:
+    """Refresh the workspace for one variant: copy config, symlink the rest."""
+    ws = WORKSPACE_ROOT / vid
+    ws.mkdir(parents=True, exist_ok=True)
+    for entry in ROOT.iterdir():
+        if entry.name in WORKSPACE_SKIP:
             continue
-        name = name_line.split(":", 1)[1].strip()
-        if name in top_profiles:
-            updated.append(update_profile_block(block, deltas))
-        else:
-            updated.append(block)
-    ai_profiles_path.write_text("\n".join("\n".join(b) for b in updated) + "\n")
+        dest = ws / entry.name
+        if entry.name in WORKSPACE_COPIES:
+            if dest.is_symlink():
+                dest.unlink()
+            if entry.is_dir():
+                shutil.rmtree(dest, ignore_errors=True)
+                shutil.copytree(entry, dest)
+            else:
+                shutil.copy2(entry, dest)
+        elif not dest.is_symlink():
+            if dest.is_dir():
+                shutil.rmtree(dest)
+            elif dest.exists():
+                dest.unlink()
+            dest.symlink_to(entry)
+    return ws
+
+
+def run_variant(
+    variant: Dict,
+    top_profiles: List[str],
+    matches_per_pair: int,
+    parallel: int,
+    skip_reachability: bool,
+    run_stamp: str,
+    simulate_bin: pathlib.Path,
+) -> VariantResult:
+    vid = variant["id"]
+    label = variant.get("label", "")
+    constants = variant.get("constants", {})
+    deltas = variant.get("profile_deltas", {})
+
+    ws = prepare_workspace(vid)
+    apply_constants(ws / "config/heatmap_tuning.json", constants)
+    apply_profile_deltas(ws / "config/ai_profiles.txt", top_profiles, deltas)
+
+    cmd = [
+        str(simulate_bin),
+        "--tournament", str(matches_per_pair),
+        "--parallel", str(parallel),
+        "--profiles", ",".join(top_profiles),
+    ]
+    env = {"BALLGAME_SKIP_REACHABILITY_HEATMAPS": "1"} if skip_reachability else None
+    code, out, db_paths = run_cmd(cmd, ws, env=env, capture=DB_PATH_RE)
+    if code != 0:
+        print(out)
+        raise RuntimeError(f"Tournament failed for {vid}")
+    if not db_paths:
+        raise RuntimeError("Could not parse tournament DB path")
+
+    # Tournament DBs are named by the second; tag with the variant so
+    # concurrent variants cannot collide once moved into db/
+    db_path = f"db/{pathlib.Path(db_paths[0]).stem}_{vid}.db"
+    shutil.move(str(ws / db_paths[0]), str(ROOT / db_path))
+
+    # Reports are filled in by the batched analyze run in main
+    return VariantResult(
+        variant_id=vid,
+        label=label,
+        constants=constants,
+        profile_deltas=deltas,
+        db_path=db_path,
+        focused_report=f"notes/analysis_runs/focused_{run_stamp}_{vid}.md",
+        event_audit_report=f"notes/analysis_runs/event_audit_{run_stamp}_{vid}.md",
+        summary={},
+    )
+
+
+def run_analyze_batch(
+    analyze_bin: pathlib.Path,
+    focused: List[Tuple[str, str]],
+    audits: List[Tuple[str, str, str]],
+) -> None:
+    """Run every (db, report) focused analysis and (base, current, report)
+    event audit in a single analyze process."""
+    cmd = [str(analyze_bin)]
+    for db_path, report in focused:
+        cmd.extend(["--focused", db_path, "--focused-output", report])
+    for base_db, current_db, report in audits:
+        cmd.extend(["--event-audit", base_db, current_db, "--audit-output", report])
+    code, out, _ = run_cmd(cmd, ROOT)
+    if code != 0:
+        print(out)
+        raise RuntimeError("Analysis batch failed")
 
 
 def parse_focused_summary(report_path: pathlib.Path) -> Dict[str, float]:
     summary = {}
     text = report_path.read_text()
-    summary_block = re.search(r"## Summary\n(.*?)\n\n", text, re.S)
+    summary_block = SUMMARY_BLOCK_RE.search(text)
     if not summary_block:
         return summary
-    for line in summary_block.group(1).splitlines():
-        m = re.match(r"- ([^:]+): ([0-9.]+)", line.strip())
-        if m:
-            summary[m.group(1).strip()] = float(m.group(2))
+    for m in SUMMARY_LINE_RE.finditer(summary_block.group(1)):
+        summary[m.group(1).strip()] = float(m.group(2))
     return summary
 
 
@@ -175,7 +377,7 @@ def pick_top_variants(results: List[VariantResult], count: int = 3) -> List[Vari
         shots = r.summary.get("Shots/match", 0.0)
         scoreless = r.summary.get("Scoreless rate", 1.0)
         return (goals, shots, -scoreless)
-    return sorted(results, key=score, reverse=True)[:count]
+    return heapq.nlargest(count, results, key=score)
 
 
 def main() -> int:
@@ -185,6 +387,8 @@ def main() -> int:
     parser.add_argument("--matches-per-pair", type=int, default=2)
     parser.add_argument("--profiles", default=None)
     parser.add_argument("--parallel", type=int, default=16)
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Variants to run concurrently (default: cpu_count // --parallel)")
     parser.add_argument("--skip-heatmaps", action="store_true")
     parser.add_argument("--heatmap-levels", default=None)
     parser.add_argument("--levels-from-sim-settings", action="store_true")
@@ -198,7 +402,6 @@ def main() -> int:
         print("No variants found.")
         return 1
 
-    constants_path = ROOT / "src/constants.rs"
     ai_profiles_path = ROOT / "config/ai_profiles.txt"
     levels_path = ROOT / "config/levels.txt"
     sim_settings_path = ROOT / "config/simulation_settings.json"
@@ -209,174 +412,155 @@ def main() -> int:
         top_profiles = parse_top_profiles(ai_profiles_path, 4)
 
     baseline_db = args.baseline_db
-
-    # Backup files
-    constants_backup = constants_path.read_text()
-    profiles_backup = ai_profiles_path.read_text()
-
-    results: List[VariantResult] = []
-    try:
-        skip_reachability = False
-        if not args.skip_heatmaps:
-            level_list = []
-            if args.heatmap_levels:
-                level_list = [lvl.strip() for lvl in args.heatmap_levels.split(",") if lvl.strip()]
-            elif args.levels_from_sim_settings:
-                level_list = resolve_levels_from_sim_settings(levels_path, sim_settings_path)
-            if not level_list:
-                raise RuntimeError(
-                    "No heatmap levels specified. Provide --heatmap-levels or ensure config/simulation_settings.json has levels."
-                )
-            skip_reachability = True
-            print("NOTE: reachability-dependent heatmaps disabled (TODO in src/bin/heatmap.rs).")
-            heatmap_kinds = [
-                "speed",
-                "score",
-                "landing_safety",
-                "line_of_sight",
-                "elevation",
-            ]
-            for idx, kind in enumerate(heatmap_kinds):
-                heatmap_cmd = [
-                    "cargo",
-                    "run",
-                    "--release",
-                    "--bin",
-                    "heatmap",
-                    "--",
-                    "--type",
-                    kind,
-                    "--check",
-                ]
-                if idx == 0:
-                    heatmap_cmd.append("--refresh")
+    result_file = pathlib.Path(args.result_file) if args.result_file else None
+
+    # Output directories are created once up front rather than per write
+    (ROOT / "db").mkdir(exist_ok=True)
+    (ROOT / "notes/analysis_runs").mkdir(parents=True, exist_ok=True)
+    if result_file:
+        result_file.parent.mkdir(parents=True, exist_ok=True)
+
+    skip_reachability = False
+    if not args.skip_heatmaps:
+        level_list = []
+        if args.heatmap_levels:
+            level_list = [lvl.strip() for lvl in args.heatmap_levels.split(",") if lvl.strip()]
+        elif args.levels_from_sim_settings:
+            level_list = resolve_levels_from_sim_settings(levels_path, sim_settings_path)
+        if not level_list:
+            raise RuntimeError(
+                "No heatmap levels specified. Provide --heatmap-levels or ensure config/simulation_settings.json has levels."
+            )
+        skip_reachability = True
+        print("NOTE: reachability-dependent heatmaps disabled (TODO in src/bin/heatmap.rs).")
+        heatmap_kinds = [
+            "speed",
+            "score",
+            "landing_safety",
+            "line_of_sight",
+            "elevation",
+        ]
+        heatmap_bin = build_binaries(ROOT, ["heatmap"]) / "heatmap"
+        marker = HEATMAP_CACHE_DIR / f"{heatmap_cache_key(heatmap_bin, level_list, heatmap_kinds)}.marker"
+        if heatmaps_present(marker):
+            print("Heatmaps up to date (inputs unchanged); skipping generation.")
+        else:
+            def heatmap_cmd(kind: str, refresh: bool = False) -> List[str]:
+                cmd = [str(heatmap_bin), "--type", kind, "--check"]
+                if refresh:
+                    cmd.append("--refresh")
                 for level in level_list:
-                    heatmap_cmd.extend(["--level", level])
-                code, out = run_cmd(heatmap_cmd, ROOT)
-                if code != 0:
-                    print(out)
-                    raise RuntimeError(f"Heatmap generation failed for type {kind}")
-
-        for variant in variants:
-            vid = variant["id"]
-            label = variant.get("label", "")
-            constants = variant.get("constants", {})
-            deltas = variant.get("profile_deltas", {})
-
-            apply_constants(constants_path, constants)
-            apply_profile_deltas(ai_profiles_path, top_profiles, deltas)
-
-            cmd = [
-                "cargo", "run", "--release", "--bin", "simulate", "--",
-                "--tournament", str(args.matches_per_pair),
-                "--parallel", str(args.parallel),
-                "--profiles", ",".join(top_profiles),
-            ]
-            env = {"BALLGAME_SKIP_REACHABILITY_HEATMAPS": "1"} if skip_reachability else None
-            code, out = run_cmd(cmd, ROOT, env=env)
-            if code != 0:
-                print(out)
-                raise RuntimeError(f"Tournament failed for {vid}")
-            m = re.search(r"Using database: (db/[^\s]+)", out)
-            if not m:
-                raise RuntimeError("Could not parse tournament DB path")
-            db_path = m.group(1)
+                    cmd.extend(["--level", level])
+                return cmd
 
-            code, out = run_cmd(["cargo", "run", "--bin", "analyze", "--", "--focused", db_path], ROOT)
-            if code != 0:
-                print(out)
-                raise RuntimeError(f"Focused analysis failed for {vid}")
-            m = re.search(r"Focused analysis written to (notes/[^\s]+)", out)
-            if not m:
-                raise RuntimeError("Could not parse focused report path")
-            focused_report = m.group(1)
-
-            code, out = run_cmd([
-                "cargo", "run", "--bin", "analyze", "--",
-                "--event-audit", baseline_db, db_path
-            ], ROOT)
+            # --refresh deletes every heatmap output, so markers for any other
+            # inputs are stale from here on; only the current one is rewritten
+            shutil.rmtree(HEATMAP_CACHE_DIR, ignore_errors=True)
+
+            # The first kind clears prior outputs, so it must finish before
+            # the others start; the remaining kinds are independent
+            code, out, _ = run_cmd(heatmap_cmd(heatmap_kinds[0], refresh=True), ROOT)
             if code != 0:
                 print(out)
-                raise RuntimeError(f"Event audit failed for {vid}")
-            m = re.search(r"Event audit written to (notes/[^\s]+)", out)
-            if not m:
-                raise RuntimeError("Could not parse event audit path")
-            event_audit_report = m.group(1)
-
-            summary = parse_focused_summary(ROOT / focused_report)
-            results.append(VariantResult(
-                variant_id=vid,
-                label=label,
-                constants=constants,
-                profile_deltas=deltas,
-                db_path=db_path,
-                focused_report=focused_report,
-                event_audit_report=event_audit_report,
-                summary=summary,
-            ))
-
-        top3 = pick_top_variants(results, 3)
-        pairwise = []
-        for i in range(len(top3)):
-            for j in range(i + 1, len(top3)):
-                left = top3[i]
-                right = top3[j]
-                code, out = run_cmd([
-                    "cargo", "run", "--bin", "analyze", "--",
-                    "--event-audit", left.db_path, right.db_path
-                ], ROOT)
-                if code != 0:
-                    print(out)
-                    raise RuntimeError("Pairwise event audit failed")
-                m = re.search(r"Event audit written to (notes/[^\s]+)", out)
-                if not m:
-                    raise RuntimeError("Could not parse pairwise audit path")
-                pairwise.append((left.variant_id, right.variant_id, m.group(1)))
-
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        result_path = pathlib.Path(args.result_file) if args.result_file else ROOT / f"notes/analysis_runs/variant_tournament_summary_{timestamp}.md"
-
-        lines = []
-        lines.append("# Variant Tournament Summary\n")
-        lines.append(f"Baseline DB: `{baseline_db}`\n")
-        lines.append(f"Profiles: {', '.join(top_profiles)}\n")
-        lines.append(f"Matches per pair: {args.matches_per_pair}\n")
-        lines.append(f"Parallel: {args.parallel}\n")
-        lines.append("\n## Variants\n")
-        for r in results:
-            lines.append(f"### {r.variant_id} ({r.label})\n")
-            lines.append(f"DB: `{r.db_path}`\n")
-            lines.append(f"Focused report: `{r.focused_report}`\n")
-            lines.append(f"Event audit: `{r.event_audit_report}`\n")
-            lines.append("Constants:\n")
-            for k, v in r.constants.items():
-                lines.append(f"- {k}: {v}")
-            lines.append("Profile deltas:\n")
-            for k, v in r.profile_deltas.items():
-                lines.append(f"- {k}: {v}")
-            lines.append("Summary:\n")
-            for k, v in r.summary.items():
-                lines.append(f"- {k}: {v}")
-            lines.append("\n")
-
-        lines.append("## Top 3 Variants (by goals/match, shots/match, scoreless rate)\n")
-        for r in top3:
-            lines.append(f"- {r.variant_id}: goals {r.summary.get('Goals/match', 0.0):.3f}, shots {r.summary.get('Shots/match', 0.0):.3f}, scoreless {r.summary.get('Scoreless rate', 0.0):.3f}")
-        lines.append("\n## Pairwise Deltas (Top 3)\n")
-        for a, b, report in pairwise:
-            lines.append(f"- {a} vs {b}: `{report}`")
-
-        lines.append("\n## Suggestions\n")
-        lines.append("- Favor variants that increase shots/match without dropping shot% below baseline.")
-        lines.append("- If scoreless rate rises above 0.20, raise min_shot_quality or tighten LOS threshold.")
-        lines.append("- For higher tempo, reduce position_patience and seek_threshold, but watch steal attempts.")
-
-        write_text(result_path, "\n".join(lines) + "\n")
-        print(f"Summary written to {result_path}")
-
-    finally:
-        constants_path.write_text(constants_backup)
-        ai_profiles_path.write_text(profiles_backup)
+                raise RuntimeError(f"Heatmap generation failed for type {heatmap_kinds[0]}")
+            rest = heatmap_kinds[1:]
+            with ThreadPoolExecutor(max_workers=len(rest)) as pool:
+                futures = [pool.submit(run_cmd, heatmap_cmd(kind), ROOT) for kind in rest]
+                for kind, future in zip(rest, futures):
+                    code, out, _ = future.result()
+                    if code != 0:
+                        print(out)
+                        raise RuntimeError(f"Heatmap generation failed for type {kind}")
+            write_heatmap_marker(marker)
+
+    # One release build for both, so analyze never triggers a separate debug build
+    bin_dir = build_binaries(ROOT, ["simulate", "analyze"])
+    simulate_bin = bin_dir / "simulate"
+    analyze_bin = bin_dir / "analyze"
+
+    jobs = args.jobs or max(1, (os.cpu_count() or 1) // max(1, args.parallel))
+    run_stamp = time.strftime("%Y%m%d_%H%M%S")
+    with ThreadPoolExecutor(max_workers=min(jobs, len(variants))) as pool:
+        futures = [
+            pool.submit(
+                run_variant,
+                variant,
+                top_profiles,
+                args.matches_per_pair,
+                args.parallel,
+                skip_reachability,
+                run_stamp,
+                simulate_bin,
+            )
+            for variant in variants
+        ]
+        results = [f.result() for f in futures]
+
+    # All analysis runs from the main tree in one analyze process per phase:
+    # every variant's focused report and baseline audit, then the pairwise
+    # audits, which need the focused summaries to pick the top 3
+    run_analyze_batch(
+        analyze_bin,
+        [(r.db_path, r.focused_report) for r in results],
+        [(baseline_db, r.db_path, r.event_audit_report) for r in results],
+    )
+    for r in results:
+        r.summary = parse_focused_summary(ROOT / r.focused_report)
+
+    top3 = pick_top_variants(results, 3)
+    pairwise = []
+    pairwise_audits = []
+    for i in range(len(top3)):
+        for j in range(i + 1, len(top3)):
+            left = top3[i]
+            right = top3[j]
+            report = f"notes/analysis_runs/event_audit_{run_stamp}_{left.variant_id}_vs_{right.variant_id}.md"
+            pairwise_audits.append((left.db_path, right.db_path, report))
+            pairwise.append((left.variant_id, right.variant_id, report))
+    if pairwise_audits:
+        run_analyze_batch(analyze_bin, [], pairwise_audits)
+
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    result_path = result_file or ROOT / f"notes/analysis_runs/variant_tournament_summary_{timestamp}.md"
+
+    buf = io.StringIO()
+    w = buf.write
+    w("# Variant Tournament Summary\n\n")
+    w(f"Baseline DB: `{baseline_db}`\n\n")
+    w(f"Profiles: {', '.join(top_profiles)}\n\n")
+    w(f"Matches per pair: {args.matches_per_pair}\n\n")
+    w(f"Parallel: {args.parallel}\n\n")
+    w("\n## Variants\n\n")
+    for r in results:
+        w(f"### {r.variant_id} ({r.label})\n\n")
+        w(f"DB: `{r.db_path}`\n\n")
+        w(f"Focused report: `{r.focused_report}`\n\n")
+        w(f"Event audit: `{r.event_audit_report}`\n\n")
+        w("Constants:\n\n")
+        for k, v in r.constants.items():
+            w(f"- {k}: {v}\n")
+        w("Profile deltas:\n\n")
+        for k, v in r.profile_deltas.items():
+            w(f"- {k}: {v}\n")
+        w("Summary:\n\n")
+        for k, v in r.summary.items():
+            w(f"- {k}: {v}\n")
+        w("\n\n")
+
+    w("## Top 3 Variants (by goals/match, shots/match, scoreless rate)\n\n")
+    for r in top3:
+        w(f"- {r.variant_id}: goals {r.summary.get('Goals/match', 0.0):.3f}, shots {r.summary.get('Shots/match', 0.0):.3f}, scoreless {r.summary.get('Scoreless rate', 0.0):.3f}\n")
+    w("\n## Pairwise Deltas (Top 3)\n\n")
+    for a, b, report in pairwise:
+        w(f"- {a} vs {b}: `{report}`\n")
+
+    w("\n## Suggestions\n\n")
+    w("- Favor variants that increase shots/match without dropping shot% below baseline.\n")
+    w("- If scoreless rate rises above 0.20, raise min_shot_quality or tighten LOS threshold.\n")
+    w("- For higher tempo, reduce position_patience and seek_threshold, but watch steal attempts.\n")
+
+    result_path.write_text(buf.getvalue())
+    print(f"Summary written to {result_path}")
 
     return 0
 
@@ -19,17 +19,67 @@ def iter_db_paths(args):
         yield Path(db)
 
 
-def sum_db(db_path: Path):
+# SQLite's default SQLITE_MAX_ATTACHED; longer lists are summed in batches.
+ATTACH_BATCH_SIZE = 10
+
+
+def _sum_sql(idx: int, schema: str) -> str:
+    return f"SELECT {idx}, COUNT(*), COALESCE(SUM(duration_secs), 0) FROM {schema}.matches"
+
+
+def _failed(db_path: Path, err: sqlite3.DatabaseError):
+    """Result for a DB that could not be read: missing, or the SQLite error."""
+    # Only stat after a failure; readable DBs never pay for the check
     if not db_path.exists():
-        return None, None
-    conn = sqlite3.connect(str(db_path))
+        return (None, None, None)
+    return (None, None, str(err))
+
+
+def sum_dbs(db_paths: list[Path]):
+    """Return (matches, secs, error) per DB path.
+
+    Missing DBs come back as (None, None, None) and unreadable ones as
+    (None, None, message). Every DB is read through one in-memory
+    connection: each batch is ATTACHed and summed with a single UNION ALL
+    query.
+    """
+    results = [(None, None, None)] * len(db_paths)
+    conn = sqlite3.connect(":memory:", uri=True)
     try:
-        cur = conn.cursor()
-        cur.execute("SELECT COUNT(*), COALESCE(SUM(duration_secs), 0) FROM matches")
-        row = cur.fetchone()
-        return row[0], row[1]
+        for start in range(0, len(db_paths), ATTACH_BATCH_SIZE):
+            attached = []
+            for idx in range(start, min(start + ATTACH_BATCH_SIZE, len(db_paths))):
+                schema = f"db{len(attached)}"
+                # A read-only URI makes a missing file fail the ATTACH instead
+                # of being created, so no separate exists() stat is needed.
+                uri = f"{db_paths[idx].absolute().as_uri()}?mode=ro"
+                try:
+                    conn.execute(f"ATTACH DATABASE ? AS {schema}", (uri,))
+                except sqlite3.DatabaseError as e:
+                    results[idx] = _failed(db_paths[idx], e)
+                    continue
+                attached.append((idx, schema))
+            if not attached:
+                continue
+            query = " UNION ALL ".join(_sum_sql(idx, schema) for idx, schema in attached)
+            try:
+                rows = conn.execute(query).fetchall()
+            except sqlite3.DatabaseError:
+                # One bad DB fails the whole batch; query each on its own so
+                # the error lands on the right path
+                rows = []
+                for idx, schema in attached:
+                    try:
+                        rows += conn.execute(_sum_sql(idx, schema)).fetchall()
+                    except sqlite3.DatabaseError as e:
+                        results[idx] = _failed(db_paths[idx], e)
+            for idx, matches, secs in rows:
+                results[idx] = (matches, secs, None)
+            for _, schema in attached:
+                conn.execute(f"DETACH DATABASE {schema}")
     finally:
         conn.close()
+    return results
 
 
 def main():
@@ -40,13 +90,17 @@ def main():
 
     total_matches = 0
     total_secs = 0.0
-    any_missing = False
+    any_failed = False
 
-    for db_path in iter_db_paths(args):
-        matches, secs = sum_db(db_path)
+    paths = list(iter_db_paths(args))
+    for db_path, (matches, secs, error) in zip(paths, sum_dbs(paths)):
+        if error is not None:
+            print(f"Failed to read DB {db_path}: {error}")
+            any_failed = True
+            continue
         if matches is None:
             print(f"Missing DB: {db_path}")
-            any_missing = True
+            any_failed = True
             continue
         total_matches += matches
         total_secs += secs
@@ -55,7 +109,7 @@ def main():
     print("---")
     print(f"Total matches: {total_matches}")
     print(f"Total time: {total_secs:.1f}s ({total_secs/60.0:.1f} min)")
-    if any_missing:
+    if any_failed:
         raise SystemExit(1)
 
 
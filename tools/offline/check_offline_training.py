@@ -3,7 +3,9 @@
 
 from __future__ import annotations
 
+import fnmatch
 import json
+import os
 import re
 import sys
 from pathlib import Path
@@ -21,6 +23,15 @@ RE_LEVELS_HEADER = re.compile(r"^Non-debug levels to cover$", re.IGNORECASE)
 RE_PROFILES_HEADER = re.compile(r"^Profiles \(top 4 from rankings\)$", re.IGNORECASE)
 BULLET = re.compile(r"^-\s+(.*)$")
 
+# Config fields, matched over the whole file rather than line by line
+RE_LEVEL_FIELD = re.compile(r"^[ \t]*(level|id):(.*)$", re.M)
+RE_PROFILE_LINE = re.compile(r"^[ \t]*(?:(?:profile|name):(.*)|([^#\s]\S*).*)$", re.M)
+_SCAN_CACHE: dict[tuple[str, str], tuple[int, list[tuple]]] = {}
+
+# Heatmap file names keep ASCII alphanumerics only (Rust sanitize_level_name);
+# each other run becomes one underscore
+RE_NON_ALNUM_RUN = re.compile(r"[^0-9A-Za-z]+")
+
 REQUIRED_HEATMAP_TYPES = [
     "speed",
     "score",
@@ -62,60 +73,49 @@ def load_manual_lists(todo_path: Path):
     return levels, profiles
 
 
+def scan_matches(path: Path, pattern: re.Pattern) -> list[tuple]:
+    """Groups of every match of pattern in path, scanned over the whole file.
+
+    Cached until the file's mtime changes, so repeated loads are free.
+    """
+    key = (str(path), pattern.pattern)
+    mtime = path.stat().st_mtime_ns
+    cached = _SCAN_CACHE.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    matches = [m.groups() for m in pattern.finditer(path.read_text())]
+    _SCAN_CACHE[key] = (mtime, matches)
+    return matches
+
+
 def load_levels_db(levels_path: Path):
+    """Level names in file order and a name -> id map, from one pass."""
     if not levels_path.exists():
-        return []
+        return [], {}
     names = []
-    for line in levels_path.read_text().splitlines():
-        line = line.strip()
-        if line.startswith("level:"):
-            names.append(line.split(":", 1)[1].strip())
-    return names
+    ids = {}
+    current = None
+    for field, value in scan_matches(levels_path, RE_LEVEL_FIELD):
+        if field == "level":
+            current = value.strip()
+            names.append(current)
+        elif current:
+            ids[current] = value.strip()
+    return names, ids
 
 
 def load_profiles(path: Path):
     if not path.exists():
         return []
-    names = []
-    for line in path.read_text().splitlines():
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        if line.startswith("profile:"):
-            names.append(line.split(":", 1)[1].strip())
-        elif line.startswith("name:"):
-            names.append(line.split(":", 1)[1].strip())
-        else:
-            # fallback: first token
-            parts = line.split()
-            if parts:
-                names.append(parts[0])
-    return names
+    # group 1: "profile:"/"name:" value; group 2: fallback first token
+    return [
+        named.strip() if named is not None else token
+        for named, token in scan_matches(path, RE_PROFILE_LINE)
+    ]
 
 
 def sanitize_level_name(name: str) -> str:
-    out = []
-    last_underscore = False
-    for ch in name:
-        if ch.isalnum():
-            out.append(ch.lower())
-            last_underscore = False
-        elif not last_underscore:
-            out.append("_")
-            last_underscore = True
-    return "".join(out).strip("_")
-
-
-def load_level_ids(levels_path: Path):
-    ids = {}
-    current = None
-    for line in levels_path.read_text().splitlines():
-        line = line.strip()
-        if line.startswith("level:"):
-            current = line.split(":", 1)[1].strip()
-        elif line.startswith("id:") and current:
-            ids[current] = line.split(":", 1)[1].strip()
-    return ids
+    return RE_NON_ALNUM_RUN.sub("_", name).lower().strip("_")
 
 
 def list_heatmaps_for_level(level_name: str, level_id: str | None):
@@ -140,10 +140,18 @@ def list_heatmaps_for_level(level_name: str, level_id: str | None):
     return files
 
 
-def match_exists(pattern: str):
+def list_heatmap_files(heatmap_dir: Path) -> set[str]:
+    """Snapshot the file names in heatmap_dir with a single directory scan."""
+    if not heatmap_dir.is_dir():
+        return set()
+    with os.scandir(heatmap_dir) as entries:
+        return {entry.name for entry in entries if entry.is_file()}
+
+
+def match_exists(pattern: str, existing: set[str]):
     if "*" in pattern:
-        return any(HEATMAP_DIR.glob(pattern))
-    return (HEATMAP_DIR / pattern).exists()
+        return bool(fnmatch.filter(existing, pattern))
+    return pattern in existing
 
 
 def check_debug_settings():
@@ -185,11 +193,11 @@ def check_training_settings(levels: list[str], profiles: list[str]):
     offline_path = (ROOT / offline_file).resolve()
     if not offline_path.exists():
         return False, f"offline levels file missing: {offline_path}"
-    offline_levels = [
+    offline_levels = {
         line.strip().lower()
         for line in offline_path.read_text().splitlines()
         if line.strip() and not line.strip().startswith("#")
-    ]
+    }
     missing_in_offline = [
         lvl for lvl in levels if lvl.lower() not in offline_levels
     ]
@@ -199,78 +207,70 @@ def check_training_settings(levels: list[str], profiles: list[str]):
     return True, "training settings align with offline lists"
 
 def main():
-    print("Offline training prereq check (PASS/FAIL)\n")
+    # Every check runs unconditionally; results are collected in order and
+    # the whole report goes out in a single write at the end
+    lines = ["Offline training prereq check (PASS/FAIL)\n"]
+    failures = []
+
+    def record(ok: bool, msg: str, details=()):
+        if not ok:
+            failures.append(msg)
+        lines.append(f"{'PASS' if ok else 'FAIL'}: {msg}")
+        lines.extend(f"  - {detail}" for detail in details)
 
-    ok = True
+    def emit():
+        sys.stdout.write("\n".join(lines) + "\n")
+        return 1 if failures else 0
 
     levels, profiles = load_manual_lists(TODO_PATH)
     if not levels:
-        print("FAIL: No levels parsed from manual_todo.md")
-        return 1
+        record(False, "No levels parsed from manual_todo.md")
+        return emit()
     if not profiles:
-        print("FAIL: No profiles parsed from manual_todo.md")
-        return 1
+        record(False, "No profiles parsed from manual_todo.md")
+        return emit()
 
-    print(f"Levels listed: {len(levels)}")
-    print(f"Profiles listed: {len(profiles)}\n")
+    lines.append(f"Levels listed: {len(levels)}")
+    lines.append(f"Profiles listed: {len(profiles)}\n")
 
-    level_db = load_levels_db(LEVELS_FILE)
-    level_ids = load_level_ids(LEVELS_FILE)
-    profile_db = load_profiles(PROFILES_FILE)
+    level_names, level_ids = load_levels_db(LEVELS_FILE)
+    level_db = set(level_names)
+    profile_db = set(load_profiles(PROFILES_FILE))
 
     missing_levels = [lvl for lvl in levels if lvl not in level_db]
     if missing_levels:
-        ok = False
-        print("FAIL: Missing levels in config/levels.txt:")
-        for lvl in missing_levels:
-            print(f"  - {lvl}")
+        record(False, "Missing levels in config/levels.txt:", missing_levels)
     else:
-        print("PASS: All levels exist in config/levels.txt")
+        record(True, "All levels exist in config/levels.txt")
 
     missing_profiles = [p for p in profiles if p not in profile_db]
     if missing_profiles:
-        ok = False
-        print("FAIL: Missing profiles in config/ai_profiles.txt:")
-        for p in missing_profiles:
-            print(f"  - {p}")
+        record(False, "Missing profiles in config/ai_profiles.txt:", missing_profiles)
     else:
-        print("PASS: All profiles exist in config/ai_profiles.txt")
+        record(True, "All profiles exist in config/ai_profiles.txt")
 
-    if not HEATMAP_DIR.exists():
-        ok = False
-        print(f"FAIL: Heatmap directory missing: {HEATMAP_DIR}")
-    else:
-        print(f"PASS: Heatmap directory exists: {HEATMAP_DIR}")
+    heatmap_dir_ok = HEATMAP_DIR.exists()
+    record(
+        heatmap_dir_ok,
+        f"Heatmap directory {'exists' if heatmap_dir_ok else 'missing'}: {HEATMAP_DIR}",
+    )
 
+    existing_heatmaps = list_heatmap_files(HEATMAP_DIR)
     missing_heatmaps = []
     for lvl in levels:
         level_id = level_ids.get(lvl)
         expected = list_heatmaps_for_level(lvl, level_id)
         for pattern in expected:
-            if not match_exists(pattern):
-                missing_heatmaps.append((lvl, pattern))
+            if not match_exists(pattern, existing_heatmaps):
+                missing_heatmaps.append(f"{lvl}: {pattern}")
 
     if missing_heatmaps:
-        ok = False
-        print("FAIL: Missing heatmaps")
-        for lvl, pattern in missing_heatmaps:
-            print(f"  - {lvl}: {pattern}")
+        record(False, "Missing heatmaps", missing_heatmaps)
     else:
-        print("PASS: All required heatmaps present")
+        record(True, "All required heatmaps present")
 
-    settings_ok, settings_msg = check_training_settings(levels, profiles)
-    if settings_ok:
-        print(f"PASS: {settings_msg}")
-    else:
-        ok = False
-        print(f"FAIL: {settings_msg}")
-
-    debug_ok, debug_msg = check_debug_settings()
-    if debug_ok:
-        print(f"PASS: {debug_msg}")
-    else:
-        ok = False
-        print(f"FAIL: {debug_msg}")
+    record(*check_training_settings(levels, profiles))
+    record(*check_debug_settings())
 
     list_path = DEFAULT_LIST
     if list_path.exists():
@@ -280,16 +280,14 @@ def main():
             if line.strip() and not line.strip().startswith("#")
         ]
         if entries:
-            print(f"PASS: offline DB list has {len(entries)} entries")
+            record(True, f"offline DB list has {len(entries)} entries")
         else:
-            ok = False
-            print("FAIL: offline DB list is empty")
+            record(False, "offline DB list is empty")
     else:
-        ok = False
-        print(f"FAIL: offline DB list missing: {list_path}")
+        record(False, f"offline DB list missing: {list_path}")
 
-    print("\nResult:", "PASS" if ok else "FAIL")
-    return 0 if ok else 1
+    lines.append(f"\nResult: {'FAIL' if failures else 'PASS'}")
+    return emit()
 
 
 if __name__ == "__main__":
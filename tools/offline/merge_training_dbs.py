@@ -5,14 +5,38 @@ from __future__ import annotations
 
 import argparse
 import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Iterable
+from typing import Any, Callable
 
 ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_LIST = ROOT / "offline_training" / "db_list.txt"
 DEFAULT_OUT = ROOT / "db" / "combined_offline_training.db"
 
-SCHEMA_SQL = r"""
+# Write-side SQLite tuning for the rebuilt-from-scratch output DB:
+# 256 MiB page cache, 1 GiB memory-mapped I/O
+DEST_CACHE_SIZE = -262144
+DEST_MMAP_SIZE = 1024 * 1024 * 1024
+# Largest page SQLite supports: shallower b-trees and fewer, larger writes
+DEST_PAGE_SIZE = 65536
+
+# Read-side tuning for each attached source, scanned once front to back:
+# 128 MiB page cache, 1 GiB memory-mapped I/O
+SRC_CACHE_SIZE = -131072
+SRC_MMAP_SIZE = 1024 * 1024 * 1024
+
+# Rows per multi-row INSERT ... VALUES statement on the --no-attach path
+VALUES_BATCH_ROWS = 500
+
+# Tables whose INTEGER PRIMARY KEY ids are shifted by a per-source offset
+ID_TABLES = ("matches", "points", "player_stats", "events", "debug_events")
+# Tables copied into the main output and into the --split-debug sibling
+MAIN_TABLES = ("sessions", "matches", "points", "player_stats", "events")
+DEBUG_TABLES = ("debug_events",)
+ALL_TABLES = MAIN_TABLES + DEBUG_TABLES
+
+SCHEMA_TABLES_SQL = r"""
 CREATE TABLE IF NOT EXISTS sessions (
     id TEXT PRIMARY KEY,
     created_at TEXT NOT NULL,
@@ -74,7 +98,11 @@ CREATE TABLE IF NOT EXISTS events (
     data TEXT NOT NULL,
     created_at TEXT DEFAULT CURRENT_TIMESTAMP
 );
+"""
 
+# debug_events is by far the largest table; with --split-debug it goes to a
+# sibling DB file instead of the main output
+DEBUG_SCHEMA_SQL = r"""
 CREATE TABLE IF NOT EXISTS debug_events (
     id INTEGER PRIMARY KEY,
     match_id INTEGER REFERENCES matches(id),
@@ -99,7 +127,11 @@ CREATE TABLE IF NOT EXISTS debug_events (
     human_controlled INTEGER NOT NULL,
     created_at TEXT DEFAULT CURRENT_TIMESTAMP
 );
+"""
 
+# Secondary indexes are built once after all rows are in, rather than being
+# maintained row by row during the merge
+SCHEMA_INDEXES_SQL = r"""
 CREATE INDEX IF NOT EXISTS idx_matches_session ON matches(session_id);
 CREATE INDEX IF NOT EXISTS idx_matches_profiles ON matches(left_profile, right_profile);
 CREATE INDEX IF NOT EXISTS idx_matches_level ON matches(level);
@@ -110,12 +142,72 @@ CREATE INDEX IF NOT EXISTS idx_events_type ON events(event_type);
 CREATE INDEX IF NOT EXISTS idx_events_time ON events(match_id, time_ms);
 CREATE INDEX IF NOT EXISTS idx_events_tick ON events(match_id, tick_frame);
 CREATE INDEX IF NOT EXISTS idx_points_match ON points(match_id);
+"""
+
+DEBUG_INDEXES_SQL = r"""
 CREATE INDEX IF NOT EXISTS idx_debug_match ON debug_events(match_id);
 CREATE INDEX IF NOT EXISTS idx_debug_time ON debug_events(match_id, time_ms);
 CREATE INDEX IF NOT EXISTS idx_debug_tick ON debug_events(match_id, tick_frame);
 """
 
 
+# Remapped foreign keys for a source row `s` in INSERT ... SELECT: a shift by
+# the parent table's offset, or NULL when the parent is not in the source
+MATCH_REF = (
+    "CASE WHEN EXISTS (SELECT 1 FROM src.matches p WHERE p.id = s.match_id) "
+    "THEN s.match_id + :match_offset END"
+)
+POINT_REF = (
+    "CASE WHEN EXISTS (SELECT 1 FROM src.points p WHERE p.id = s.point_id) "
+    "THEN s.point_id + :point_offset END"
+)
+
+# Copied columns per table, in schema order; the copy SQL is generated from
+# these once at import
+TABLE_COLUMNS = {
+    "sessions": ("id", "created_at", "session_type", "config_json", "display_name"),
+    "matches": (
+        "id", "session_id", "display_name", "seed", "level", "level_name", "left_profile",
+        "right_profile", "score_left", "score_right", "duration_secs", "winner",
+    ),
+    "points": ("id", "match_id", "point_index", "start_time_ms", "end_time_ms", "winner"),
+    "player_stats": (
+        "id", "match_id", "side", "goals", "shots_attempted", "shots_made", "steals_attempted",
+        "steals_successful", "possession_time", "distance_traveled", "jumps",
+        "nav_paths_completed", "nav_paths_failed", "avg_shot_x", "avg_shot_y", "avg_shot_quality",
+    ),
+    "events": (
+        "id", "match_id", "point_id", "time_ms", "tick_frame", "event_type", "data", "created_at",
+    ),
+    "debug_events": (
+        "id", "match_id", "time_ms", "tick_frame", "player", "pos_x", "pos_y", "vel_x", "vel_y",
+        "input_move_x", "input_jump", "grounded", "is_jumping", "coyote_timer",
+        "jump_buffer_timer", "facing", "nav_active", "nav_path_index", "nav_action", "level_id",
+        "human_controlled", "created_at",
+    ),
+}
+
+# Source expressions for remapped columns; everything else is copied as is
+REMAPPED_COLUMNS = {"id": "s.id + :offset", "match_id": MATCH_REF, "point_id": POINT_REF}
+
+
+def _copy_sql(table: str) -> str:
+    cols = TABLE_COLUMNS[table]
+    exprs = ", ".join(REMAPPED_COLUMNS.get(col, f"s.{col}") for col in cols)
+    return (
+        f"INSERT INTO {table} ({', '.join(cols)}) "
+        f"SELECT {exprs} FROM src.{table} s ORDER BY s.id"
+    )
+
+
+# Sessions keep their ids; the first source to have one wins
+COPY_SESSIONS_SQL = (
+    f"INSERT OR IGNORE INTO sessions ({', '.join(TABLE_COLUMNS['sessions'])}) "
+    f"SELECT {', '.join(TABLE_COLUMNS['sessions'])} FROM src.sessions"
+)
+COPY_SQL = {table: _copy_sql(table) for table in ID_TABLES}
+
+
 def read_db_list(path: Path) -> list[Path]:
     if not path.exists():
         raise FileNotFoundError(f"List file not found: {path}")
@@ -128,115 +220,330 @@ def read_db_list(path: Path) -> list[Path]:
     return dbs
 
 
-def max_id(conn: sqlite3.Connection, table: str) -> int:
-    cur = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
-    return int(cur.fetchone()[0])
-
-
-def copy_sessions(dest: sqlite3.Connection, src: sqlite3.Connection):
-    rows = src.execute(
-        "SELECT id, created_at, session_type, config_json, display_name FROM sessions"
-    ).fetchall()
-    for row in rows:
-        dest.execute(
-            "INSERT OR IGNORE INTO sessions (id, created_at, session_type, config_json, display_name) VALUES (?, ?, ?, ?, ?)",
-            row,
-        )
-
-
-def merge_db(dest: sqlite3.Connection, src_path: Path):
+def open_dest(out_path: Path | str) -> sqlite3.Connection:
+    """Open the output DB in autocommit mode, tuned for one bulk write.
+
+    The file is deleted and rebuilt on every run, so a crash only costs a
+    rerun: WAL with synchronous=NORMAL skips the per-commit fsync, and the
+    exclusive lock lets WAL run without a shared-memory index. Pass
+    ":memory:" to stage the merge in RAM (the journal pragmas are no-ops).
+    """
+    # Each connection is used by one thread at a time, but --split-debug
+    # hands the debug output to a worker thread after opening it here
+    # (uri=True lets merge_db ATTACH sources read-only by URI)
+    conn = sqlite3.connect(str(out_path), isolation_level=None, check_same_thread=False, uri=True)
+    # The file is new, so page_size and auto_vacuum take effect when the
+    # first page is written; both must come before WAL mode and the schema
+    conn.execute(f"PRAGMA page_size = {DEST_PAGE_SIZE}")
+    conn.execute("PRAGMA auto_vacuum = NONE")
+    # Ids are remapped by this script; enforcing REFERENCES on every insert
+    # would only add a parent lookup per row (--check-fk scans once at the end)
+    conn.execute("PRAGMA foreign_keys = OFF")
+    # main only: an unqualified locking_mode would also apply to every
+    # attached source, and two --split-debug connections read each source
+    conn.execute("PRAGMA main.locking_mode = EXCLUSIVE")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute(f"PRAGMA cache_size = {DEST_CACHE_SIZE}")
+    conn.execute(f"PRAGMA mmap_size = {DEST_MMAP_SIZE}")
+    return conn
+
+
+def new_offsets() -> dict[str, int]:
+    """Running id offsets for an empty dest: the max id merged so far per table."""
+    return dict.fromkeys(ID_TABLES, 0)
+
+
+def merge_db(
+    dest: sqlite3.Connection,
+    src_path: Path,
+    offsets: dict[str, int],
+    quiet: bool = False,
+    tables: tuple[str, ...] = ALL_TABLES,
+):
     if not src_path.exists():
-        print(f"Skipping missing DB: {src_path}")
+        if not quiet:
+            print(f"Skipping missing DB: {src_path}")
         return
-    src = sqlite3.connect(str(src_path))
+    # The source is attached to dest and copied with INSERT ... SELECT, so
+    # rows never leave SQLite. ATTACH is not allowed inside a transaction.
+    # Read-only, so BEGIN IMMEDIATE takes no write lock on the source.
+    dest.execute("ATTACH DATABASE ? AS src", (f"{src_path.absolute().as_uri()}?mode=ro",))
+    dest.execute(f"PRAGMA src.cache_size = {SRC_CACHE_SIZE}")
+    dest.execute(f"PRAGMA src.mmap_size = {SRC_MMAP_SIZE}")
     try:
-        copy_sessions(dest, src)
-
-        match_offset = max_id(dest, "matches")
-        point_offset = max_id(dest, "points")
-        player_stats_offset = max_id(dest, "player_stats")
-        events_offset = max_id(dest, "events")
-        debug_offset = max_id(dest, "debug_events")
-
-        match_map: Dict[int, int] = {}
-        point_map: Dict[int, int] = {}
-
-        # Matches
-        rows = src.execute(
-            "SELECT id, session_id, display_name, seed, level, level_name, left_profile, right_profile, score_left, score_right, duration_secs, winner FROM matches"
-        ).fetchall()
-        for idx, row in enumerate(rows, start=1):
-            new_id = match_offset + idx
-            match_map[row[0]] = new_id
-            dest.execute(
-                "INSERT INTO matches (id, session_id, display_name, seed, level, level_name, left_profile, right_profile, score_left, score_right, duration_secs, winner) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (new_id, *row[1:]),
-            )
-
-        # Points
-        rows = src.execute(
-            "SELECT id, match_id, point_index, start_time_ms, end_time_ms, winner FROM points"
-        ).fetchall()
-        for idx, row in enumerate(rows, start=1):
-            new_id = point_offset + idx
-            point_map[row[0]] = new_id
-            dest.execute(
-                "INSERT INTO points (id, match_id, point_index, start_time_ms, end_time_ms, winner) VALUES (?, ?, ?, ?, ?, ?)",
-                (new_id, match_map.get(row[1]), row[2], row[3], row[4], row[5]),
-            )
-
-        # Player stats
-        rows = src.execute(
-            "SELECT id, match_id, side, goals, shots_attempted, shots_made, steals_attempted, steals_successful, possession_time, distance_traveled, jumps, nav_paths_completed, nav_paths_failed, avg_shot_x, avg_shot_y, avg_shot_quality FROM player_stats"
-        ).fetchall()
-        for idx, row in enumerate(rows, start=1):
-            new_id = player_stats_offset + idx
-            dest.execute(
-                "INSERT INTO player_stats (id, match_id, side, goals, shots_attempted, shots_made, steals_attempted, steals_successful, possession_time, distance_traveled, jumps, nav_paths_completed, nav_paths_failed, avg_shot_x, avg_shot_y, avg_shot_quality) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (new_id, match_map.get(row[1]), *row[2:]),
-            )
-
-        # Events
-        rows = src.execute(
-            "SELECT id, match_id, point_id, time_ms, tick_frame, event_type, data, created_at FROM events"
-        ).fetchall()
-        for idx, row in enumerate(rows, start=1):
-            new_id = events_offset + idx
-            dest.execute(
-                "INSERT INTO events (id, match_id, point_id, time_ms, tick_frame, event_type, data, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (
-                    new_id,
-                    match_map.get(row[1]),
-                    point_map.get(row[2]) if row[2] is not None else None,
-                    row[3],
-                    row[4],
-                    row[5],
-                    row[6],
-                    row[7],
-                ),
-            )
-
-        # Debug events
-        rows = src.execute(
-            "SELECT id, match_id, time_ms, tick_frame, player, pos_x, pos_y, vel_x, vel_y, input_move_x, input_jump, grounded, is_jumping, coyote_timer, jump_buffer_timer, facing, nav_active, nav_path_index, nav_action, level_id, human_controlled, created_at FROM debug_events"
-        ).fetchall()
-        for idx, row in enumerate(rows, start=1):
-            new_id = debug_offset + idx
-            dest.execute(
-                "INSERT INTO debug_events (id, match_id, time_ms, tick_frame, player, pos_x, pos_y, vel_x, vel_y, input_move_x, input_jump, grounded, is_jumping, coyote_timer, jump_buffer_timer, facing, nav_active, nav_path_index, nav_action, level_id, human_controlled, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (new_id, match_map.get(row[1]), *row[2:]),
-            )
-
-        dest.commit()
-        print(f"Merged {src_path}")
+        # One explicit transaction per source DB; dest runs in autocommit
+        # mode (isolation_level=None) so the driver never opens implicit ones
+        dest.execute("BEGIN IMMEDIATE")
+        base = dict(offsets)
+        try:
+            if "sessions" in tables:
+                dest.execute(COPY_SESSIONS_SQL)
+
+            # New ids are old ids shifted past the current max, so every
+            # reference is remapped with the same addition and no id maps are
+            # needed. References to parents missing from the source come out
+            # NULL, as they always have. Rows arrive in ascending id order
+            # above every existing key, so each insert lands at the right edge
+            # of the table b-tree, just as an omitted id would.
+            shifts = {"match_offset": base["matches"], "point_offset": base["points"]}
+            for table in ID_TABLES:
+                if table in tables:
+                    cur = dest.execute(COPY_SQL[table], {**shifts, "offset": base[table]})
+                    # The last rowid is the table's new max id; no MAX(id) query
+                    if cur.rowcount > 0:
+                        offsets[table] = max(offsets[table], cur.lastrowid)
+                else:
+                    # Copied elsewhere, but later sources must still shift past it
+                    top = dest.execute(f"SELECT MAX(id) FROM src.{table}").fetchone()[0]
+                    if top is not None:
+                        offsets[table] = max(offsets[table], base[table] + top)
+
+            dest.execute("COMMIT")
+            if not quiet:
+                print(f"Merged {src_path}")
+        except BaseException:
+            dest.execute("ROLLBACK")
+            offsets.update(base)
+            raise
+        # Fold the committed source into the main file and reset the log, so
+        # the WAL never holds more than one source's worth of pages
+        dest.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        dest.execute("DETACH DATABASE src")
+
+
+def copy_table_values(
+    src: sqlite3.Connection,
+    dest: sqlite3.Connection,
+    table: str,
+    remap: dict[str, Callable[[Any], Any]],
+    verb: str = "INSERT",
+) -> int | None:
+    """Copy table from src to dest in multi-row INSERT ... VALUES batches.
+
+    remap maps a column name to a function applied to each of its values on
+    the way through. Returns the last rowid inserted, or None if no rows were.
+    """
+    last = None
+    cols = TABLE_COLUMNS[table]
+    fixes = [(i, remap[col]) for i, col in enumerate(cols) if col in remap]
+    col_sql = ", ".join(cols)
+    row_sql = f"({', '.join('?' * len(cols))})"
+
+    def values_sql(n: int) -> str:
+        return f"{verb} INTO {table} ({col_sql}) VALUES {', '.join([row_sql] * n)}"
+
+    # Every batch but the last has the same size, so build that statement
+    # once: the same str object skips rehashing and hits the statement cache
+    batch_sql = values_sql(VALUES_BATCH_ROWS)
+    ins = dest.cursor()
+
+    cur = src.cursor()
+    cur.arraysize = VALUES_BATCH_ROWS
+    cur.execute(f"SELECT {col_sql} FROM {table} ORDER BY rowid")
+    for rows in iter(cur.fetchmany, []):
+        params = []
+        for row in rows:
+            row = list(row)
+            for i, fix in fixes:
+                row[i] = fix(row[i])
+            params.extend(row)
+        ins.execute(batch_sql if len(rows) == VALUES_BATCH_ROWS else values_sql(len(rows)), params)
+        if ins.rowcount > 0:
+            last = ins.lastrowid
+    return last
+
+
+def merge_db_values(
+    dest: sqlite3.Connection,
+    src_path: Path,
+    offsets: dict[str, int],
+    quiet: bool = False,
+    tables: tuple[str, ...] = ALL_TABLES,
+):
+    """merge_db without ATTACH: rows are read through a separate connection.
+
+    Ids are remapped in Python with the same offsets, and references to
+    parents missing from the source still come out NULL.
+    """
+    if not src_path.exists():
+        if not quiet:
+            print(f"Skipping missing DB: {src_path}")
+        return
+    src = sqlite3.connect(f"{src_path.absolute().as_uri()}?mode=ro", uri=True)
+    src.execute(f"PRAGMA cache_size = {SRC_CACHE_SIZE}")
+    src.execute(f"PRAGMA mmap_size = {SRC_MMAP_SIZE}")
+    try:
+        match_ids = {row[0] for row in src.execute("SELECT id FROM matches")}
+        point_ids = {row[0] for row in src.execute("SELECT id FROM points")}
+
+        dest.execute("BEGIN IMMEDIATE")
+        try:
+            base = dict(offsets)
+
+            def shift(offset: int) -> Callable[[int], int]:
+                return lambda value: value + offset
+
+            def ref(ids: set[int], offset: int) -> Callable[[Any], Any]:
+                return lambda value: value + offset if value in ids else None
+
+            match_ref = ref(match_ids, base["matches"])
+            point_ref = ref(point_ids, base["points"])
+
+            if "sessions" in tables:
+                copy_table_values(src, dest, "sessions", {}, verb="INSERT OR IGNORE")
+            remaps = {
+                "matches": {"id": shift(base["matches"])},
+                "points": {"id": shift(base["points"]), "match_id": match_ref},
+                "player_stats": {"id": shift(base["player_stats"]), "match_id": match_ref},
+                "events": {"id": shift(base["events"]), "match_id": match_ref, "point_id": point_ref},
+                "debug_events": {"id": shift(base["debug_events"]), "match_id": match_ref},
+            }
+            for table in ID_TABLES:
+                if table in tables:
+                    last = copy_table_values(src, dest, table, remaps[table])
+                    if last is not None:
+                        offsets[table] = max(offsets[table], last)
+                else:
+                    top = src.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0]
+                    if top is not None:
+                        offsets[table] = max(offsets[table], base[table] + top)
+
+            dest.execute("COMMIT")
+            if not quiet:
+                print(f"Merged {src_path}")
+        except BaseException:
+            dest.execute("ROLLBACK")
+            offsets.update(base)
+            raise
+        dest.execute("PRAGMA wal_checkpoint(TRUNCATE)")
     finally:
         src.close()
 
 
+MergeFn = Callable[..., None]
+
+
+def merge_sources(
+    dest: sqlite3.Connection,
+    dbs: list[Path],
+    merge: MergeFn,
+    tables: tuple[str, ...] = ALL_TABLES,
+    quiet: bool = False,
+):
+    offsets = new_offsets()
+    for db in dbs:
+        merge(dest, db, offsets, quiet=quiet, tables=tables)
+
+
+def merge_into(
+    dest: sqlite3.Connection,
+    debug_dest: sqlite3.Connection | None,
+    dbs: list[Path],
+    merge: MergeFn = merge_db,
+    quiet: bool = False,
+):
+    """Merge dbs into dest in list order.
+
+    With a debug_dest, debug_events are merged into it instead, on its own
+    connection and thread while the main tables go into dest. Both sides
+    derive the same offsets from the sources, so match ids still line up.
+    """
+    if debug_dest is None:
+        merge_sources(dest, dbs, merge, quiet=quiet)
+        return
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        debug = pool.submit(merge_sources, debug_dest, dbs, merge, DEBUG_TABLES, True)
+        merge_sources(dest, dbs, merge, MAIN_TABLES, quiet)
+        debug.result()
+
+
+def split_evenly(items: list[Path], n: int) -> list[list[Path]]:
+    """Split items into n contiguous runs whose lengths differ by at most one."""
+    size, extra = divmod(len(items), n)
+    runs = []
+    start = 0
+    for i in range(n):
+        end = start + size + (i < extra)
+        runs.append(items[start:end])
+        start = end
+    return runs
+
+
+def merge_partial(dbs: list[Path], part_path: Path, merge: MergeFn = merge_db) -> Path:
+    dest = open_dest(part_path)
+    try:
+        dest.executescript(SCHEMA_TABLES_SQL)
+        dest.executescript(DEBUG_SCHEMA_SQL)
+        merge_sources(dest, dbs, merge)
+    finally:
+        dest.close()
+    return part_path
+
+
+def merge_parallel(
+    dest: sqlite3.Connection,
+    dbs: list[Path],
+    workers: int,
+    tmp_dir: Path,
+    merge: MergeFn = merge_db,
+    debug_dest: sqlite3.Connection | None = None,
+):
+    """Merge contiguous runs of dbs into partial DBs concurrently, then merge those.
+
+    Each worker has its own connection, and sqlite3 releases the GIL while a
+    statement runs, so threads are enough. Because the runs keep list order
+    and ids are shifted by plain offsets, the result is identical to a serial
+    merge (the first copy of a duplicate session still wins).
+    """
+    runs = split_evenly(dbs, min(workers, len(dbs)))
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as tmp:
+        parts = [Path(tmp) / f"part{i}.db" for i in range(len(runs))]
+        with ThreadPoolExecutor(max_workers=len(runs)) as pool:
+            list(pool.map(merge_partial, runs, parts, [merge] * len(runs)))
+        merge_into(dest, debug_dest, parts, merge, quiet=True)
+
+
+def save_db(conn: sqlite3.Connection, out_path: Path):
+    on_disk = sqlite3.connect(str(out_path))
+    try:
+        conn.backup(on_disk)
+    finally:
+        on_disk.close()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Merge training DBs into one combined DB")
     parser.add_argument("--list", default=str(DEFAULT_LIST), help="DB list file")
     parser.add_argument("--out", default=str(DEFAULT_OUT), help="Output DB path")
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Build the merge in RAM and write it to --out in one pass (needs memory for the whole DB)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Merge this many runs of source DBs in parallel before combining them (default: 1)",
+    )
+    parser.add_argument(
+        "--no-attach",
+        action="store_true",
+        help="Read each source over its own connection instead of ATTACHing it (slower)",
+    )
+    parser.add_argument(
+        "--split-debug",
+        action="store_true",
+        help="Write debug_events to a sibling <out>_debug DB, merged alongside the main tables",
+    )
+    parser.add_argument(
+        "--check-fk",
+        action="store_true",
+        help="Scan the merged DB for rows that reference missing parents (reads every table)",
+    )
     args = parser.parse_args()
 
     dbs = read_db_list(Path(args.list))
@@ -246,18 +553,49 @@ def main():
 
     out_path = Path(args.out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    if out_path.exists():
-        out_path.unlink()
-
-    dest = sqlite3.connect(str(out_path))
+    debug_path = out_path.with_name(f"{out_path.stem}_debug{out_path.suffix}")
+    # Drop WAL sidecars too, or a crashed earlier run's log would be
+    # replayed into the fresh file
+    for path in (out_path, debug_path):
+        for stale in (path, Path(f"{path}-wal"), Path(f"{path}-shm")):
+            if stale.exists():
+                stale.unlink()
+
+    staged = args.memory
+
+    dest = open_dest(":memory:" if staged else out_path)
+    debug_dest = None
+    if args.split_debug:
+        debug_dest = open_dest(":memory:" if staged else debug_path)
     try:
-        dest.executescript(SCHEMA_SQL)
-        for db in dbs:
-            merge_db(dest, db)
+        dest.executescript(SCHEMA_TABLES_SQL)
+        (debug_dest or dest).executescript(DEBUG_SCHEMA_SQL)
+        merge = merge_db_values if args.no_attach else merge_db
+        if args.workers > 1 and len(dbs) > 1:
+            merge_parallel(dest, dbs, args.workers, out_path.parent, merge, debug_dest)
+        else:
+            merge_into(dest, debug_dest, dbs, merge)
+        dest.executescript(SCHEMA_INDEXES_SQL)
+        (debug_dest or dest).executescript(DEBUG_INDEXES_SQL)
+        dest.execute("ANALYZE")
+        if args.check_fk:
+            violations = dest.execute("PRAGMA foreign_key_check").fetchall()
+            if violations:
+                print(f"Warning: {len(violations)} rows reference missing parents")
+        if debug_dest is not None:
+            debug_dest.execute("ANALYZE")
+        if staged:
+            save_db(dest, out_path)
+            if debug_dest is not None:
+                save_db(debug_dest, debug_path)
     finally:
         dest.close()
+        if debug_dest is not None:
+            debug_dest.close()
 
     print(f"Combined DB written to {out_path}")
+    if debug_dest is not None:
+        print(f"Debug events written to {debug_path} (ATTACH it to query debug_events)")
     return 0
 
 
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Tests for calc_training_minutes.sum_dbs.
+
+Run with: python3 -m unittest tools/offline/test_calc_training_minutes.py
+"""
+
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from calc_training_minutes import sum_dbs  # noqa: E402
+
+
+def make_db(path: Path, durations: list[float]):
+    conn = sqlite3.connect(str(path))
+    try:
+        conn.execute("CREATE TABLE matches (id INTEGER PRIMARY KEY, duration_secs REAL NOT NULL)")
+        conn.executemany("INSERT INTO matches (duration_secs) VALUES (?)", [(d,) for d in durations])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+class SumDbsTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_missing_and_corrupt_in_same_batch(self):
+        good = self.tmp / "good.db"
+        make_db(good, [60.0, 30.5])
+        missing = self.tmp / "missing.db"
+        corrupt = self.tmp / "corrupt.db"
+        corrupt.write_bytes(b"not a sqlite database" * 100)
+
+        results = sum_dbs([good, missing, corrupt, good])
+
+        self.assertEqual(results[0], (2, 90.5, None))
+        self.assertEqual(results[1], (None, None, None))
+        matches, secs, error = results[2]
+        self.assertIsNone(matches)
+        self.assertIsNone(secs)
+        self.assertIn("not a database", error)
+        self.assertEqual(results[3], (2, 90.5, None))
+        # Reading must not create the missing DB
+        self.assertFalse(missing.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()